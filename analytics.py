@@ -0,0 +1,129 @@
+import pandas as pd
+
+# Jendela keterlambatan per kategori (hari setelah periode jadwal berakhir):
+# laporan tugas yang sama di dalam jendela ini dihitung "terlambat", di luar
+# itu jadwal dianggap tidak dikerjakan. Tugas harian tidak punya toleransi.
+LATE_WINDOW = {"Harian": 0, "Mingguan": 6, "Bulanan": 30, "Tahunan": 364}
+
+
+# --- ANALITIK PENYELESAIAN ---
+# Jadwal terurai (Schedule.tasks_between) dipadatkan menjadi kemunculan:
+# tugas Mingguan/Bulanan/Tahunan terjadwal setiap hari dalam periodenya,
+# tetapi cukup dikerjakan sekali, jadi hari-hari berurutan dalam satu
+# periode (minggu ke-n bulan itu, bulan, tahun) menjadi satu baris dengan
+# waktu = hari pertama periode dan batas = hari terakhirnya. Jadwal diurai
+# per tahun penuh (period_span) supaya periode yang terpotong rentang tetap
+# utuh. Lalu satu merge_asof mencari laporan pertama sejak awal periode;
+# semua agregasi berikutnya groupby tanpa loop per hari.
+def period_span(start, end):
+    # Rentang jadwal yang perlu diurai: 1 Januari tahun start s.d. 31 Desember tahun end
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    return f"{start.year}-01-01", f"{end.year}-12-31"
+
+
+def occurrences(expanded, start=None, end=None):
+    # Kemunculan yang beririsan dengan rentang start..end (YYYY-MM-DD):
+    # tanggal (hari pertama di dalam rentang, untuk grafik), waktu (awal
+    # periode, datetime), batas, kategori, tugas
+    data = _runs(expanded)
+    if start is not None:
+        data = data[data["batas"] >= start]
+        data = data.assign(tanggal=data["tanggal"].where(data["tanggal"] >= start, start))
+    if end is not None:
+        data = data[data["tanggal"] <= end]
+    return data.reset_index(drop=True)
+
+
+def report_span(data, today):
+    # Rentang log yang perlu dibaca untuk kemunculan `data`: dari awal periode
+    # paling awal sampai batas + jendela keterlambatan terpanjang, paling jauh today
+    if data.empty:
+        return None
+    window = pd.to_timedelta(data["kategori"].map(LATE_WINDOW).fillna(0), unit="D")
+    last = min((pd.to_datetime(data["batas"]) + window).max(), pd.Timestamp(today))
+    return data["waktu"].min().strftime("%Y-%m-%d"), max(last, data["waktu"].min()).strftime("%Y-%m-%d")
+
+
+def completion_frame(data, logs, today=None):
+    # data: hasil occurrences. Ditambah kolom selesai, terlambat_hari dan
+    # berjalan (batas belum lewat dan belum dikerjakan; bukan "tidak
+    # dikerjakan"). Periode yang sudah berakhir sebelum laporan pertama di
+    # logs (aplikasi belum dipakai) tidak dinilai.
+    today = pd.Timestamp(today if today is not None else pd.Timestamp.now().date())
+    done = _done_logs(logs)
+    reports = done.assign(waktu_lapor=pd.to_datetime(done["tanggal"]).astype("datetime64[ns]"))
+    reports = reports[["waktu_lapor", "tugas"]].astype({"tugas": object}).sort_values("waktu_lapor")
+    first = reports["waktu_lapor"].min() if not reports.empty else today
+    batas = pd.to_datetime(data["batas"]).astype("datetime64[ns]")
+    data = data[(batas >= first).to_numpy()].reset_index(drop=True)
+    batas = batas[batas >= first].reset_index(drop=True)
+    left = data[["waktu", "tugas"]].astype({"tugas": object}).reset_index().sort_values("waktu")
+    found = pd.merge_asof(left, reports, left_on="waktu",
+                          right_on="waktu_lapor", by="tugas", direction="forward").set_index("index").sort_index()
+    data["selesai"] = (found["waktu_lapor"] <= batas).to_numpy()
+    lateness = (found["waktu_lapor"] - batas).dt.days
+    window = data["kategori"].map(LATE_WINDOW).fillna(0)
+    data["terlambat_hari"] = lateness.where((lateness > 0) & (lateness <= window))
+    data["berjalan"] = (~data["selesai"] & (batas >= today)).to_numpy()
+    return data
+
+
+def _runs(expanded):
+    if expanded.empty:
+        return pd.DataFrame({c: pd.Series(dtype=object) for c in ("tanggal", "batas", "kategori", "tugas")}).assign(
+            waktu=pd.Series(dtype="datetime64[ns]"))
+    waktu = pd.to_datetime(expanded["tanggal"]).astype("datetime64[ns]")
+    # Kunci periode: minggu ke-n dalam bulan (hari 29-31 ikut minggu ke-4,
+    # seperti aturan week_of_month [4, 5]), bulan, tahun; harian = tanggalnya
+    week = ((waktu.dt.day - 1) // 7).clip(upper=3).astype(str)
+    period = expanded["kategori"].map({"Mingguan": "W", "Bulanan": "M", "Tahunan": "Y"})
+    key = expanded["tanggal"].where(period.isna(), waktu.dt.strftime("%Y"))
+    key = key.mask(period.isin(["W", "M"]), waktu.dt.strftime("%Y-%m"))
+    key = key.mask(period == "W", key + "-" + week)
+    data = expanded.assign(waktu=waktu, periode=key).sort_values(["kategori", "tugas", "waktu"], kind="stable")
+    # Kemunculan baru saat tugas/periode berganti atau ada hari yang bolong
+    new = ((data["tugas"] != data["tugas"].shift()) | (data["kategori"] != data["kategori"].shift())
+           | (data["periode"] != data["periode"].shift()) | (data["waktu"].diff() != pd.Timedelta(days=1)))
+    runs = data.groupby(new.cumsum(), sort=False).agg(
+        tanggal=("tanggal", "first"), batas=("tanggal", "last"),
+        kategori=("kategori", "first"), tugas=("tugas", "first"), waktu=("waktu", "first"))
+    return runs.sort_values(["waktu", "kategori", "tugas"], kind="stable").reset_index(drop=True)
+
+
+def completion_rates(data, freq):
+    # freq: "D" harian, "W" mingguan, "M" bulanan -> jadwal, selesai, persen.
+    # Kemunculan yang masih berjalan tidak dihitung
+    data = data[~data["berjalan"]]
+    period = pd.to_datetime(data["tanggal"]).dt.to_period(freq)
+    rates = data.groupby(period)["selesai"].agg(jadwal="count", selesai="sum")
+    rates["persen"] = rates["selesai"] / rates["jadwal"] * 100
+    rates.index = rates.index.to_timestamp()
+    return rates
+
+
+def task_lateness(data):
+    # Per tugas: jumlah jadwal, tepat waktu, terlambat, rata-rata telat, tidak
+    # dikerjakan; kemunculan yang masih berjalan tidak dihitung
+    data = data[~data["berjalan"]]
+    late = data["terlambat_hari"].notna()
+    summary = data.assign(terlambat=late, tidak_dikerjakan=~data["selesai"] & ~late).groupby(["kategori", "tugas"]).agg(
+        jadwal=("selesai", "count"),
+        tepat_waktu=("selesai", "sum"),
+        terlambat=("terlambat", "sum"),
+        rata_telat_hari=("terlambat_hari", "mean"),
+        tidak_dikerjakan=("tidak_dikerjakan", "sum"),
+    )
+    summary["persen_tepat"] = summary["tepat_waktu"] / summary["jadwal"] * 100
+    return summary.reset_index().sort_values("persen_tepat")
+
+
+def _done_logs(logs):
+    if logs.empty:
+        return pd.DataFrame({"tanggal": pd.Series(dtype=str), "tugas": pd.Series(dtype=str)})
+    done = logs
+    if "status" in logs.columns:
+        done = logs[logs["status"].isna() | (logs["status"] == "Selesai")]
+    done = done[["tanggal", "tugas"]]
+    if pd.api.types.is_datetime64_any_dtype(done["tanggal"]):
+        done = done.assign(tanggal=done["tanggal"].dt.strftime("%Y-%m-%d"))
+    return done.astype(str).drop_duplicates()
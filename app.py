@@ -3,9 +3,25 @@ import pandas as pd
 from datetime import datetime
 import pytz
 import io
-import base64
+import os
+import tempfile
 from streamlit_gsheets import GSheetsConnection
-from PIL import Image
+from analytics import completion_frame, completion_rates, occurrences, period_span, report_span, task_lateness
+from blobstore import BlobStore
+from changefeed import ChangeFeed
+from config import get_metrics_config, get_storage_config, get_ui_config
+from dashboard import dashboard_data
+from export import FORMATS, available_formats, export_rows
+from imaging import make_hashed_variants
+from metrics import Metrics
+from photohash import PhotoHashIndex
+from reportbundle import BUNDLE_COLUMNS, BundleJobs
+from schedule import load_schedule
+from sites import load_sites
+from storage import bytes_read, create_storage, row_id
+from taskindex import DONE, PENDING, TaskIndex
+from typedframe import date_slice, format_date, normalize
+from uploadqueue import UploadQueue, is_journal_key
 
 # --- KONFIGURASI HALAMAN ---
 st.set_page_config(page_title="Monitoring Kebersihan Muhamka", layout="centered")
@@ -32,56 +48,170 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# --- KONEKSI GOOGLE SHEETS ---
-conn = st.connection("gsheets", type=GSheetsConnection)
+# --- KONEKSI PENYIMPANAN ---
+# Backend dipilih lewat [storage] di secrets.toml atau env STORAGE_BACKEND
+# ("gsheets" bawaan, "sqlite" untuk mode lokal/offline). Tiap sekolah di
+# sites.json punya shard sendiri; dashboard hanya memuat shard sekolahnya.
+@st.cache_resource
+def get_sites():
+    return load_sites(get_storage_config()["sites_file"])
 
-def load_data(sheet_name):
-    try:
-        return conn.read(worksheet=sheet_name, ttl="0s")
-    except:
-        return pd.DataFrame()
+def get_shard_config(site_id):
+    return get_sites().shard_config(get_storage_config(), site_id)
 
-def save_data(sheet_name, data):
-    existing_df = load_data(sheet_name)
-    updated_df = pd.concat([existing_df, data], ignore_index=True)
-    conn.update(worksheet=sheet_name, data=updated_df)
+@st.cache_resource
+def get_storage(site_id):
+    config = get_shard_config(site_id)
+    return create_storage(config, lambda: st.connection(config["connection"], type=GSheetsConnection))
+
+@st.cache_resource
+def get_blob_store():
+    return BlobStore(get_storage_config()["blob_dir"])
+
+# dHash foto terbaru per sekolah untuk menandai & menyatukan foto duplikat
+@st.cache_resource
+def get_photo_index(site_id):
+    return PhotoHashIndex(os.path.join(get_storage_config()["blob_dir"], "phash", f"{site_id}.jsonl"))
+
+# Baris yang tersimpan diterbitkan ke semua sesi sekolah yang sama di proses ini
+@st.cache_resource
+def get_change_feed(site_id):
+    return ChangeFeed()
+
+# Submit dengan foto masuk antrean latar belakang (spool di [storage] spool_dir)
+@st.cache_resource
+def get_upload_queue(site_id):
+    return UploadQueue(get_storage(site_id), get_shard_config(site_id)["spool_dir"],
+                       lambda col, raw, row: store_photo(col, io.BytesIO(raw), row, site_id),
+                       feed=get_change_feed(site_id), metrics=get_metrics())
+
+# Laporan Lengkap (ZIP berisi foto) dibangun di process pool terpisah
+@st.cache_resource
+def get_bundle_jobs():
+    config = get_storage_config()
+    return BundleJobs(config["bundle_dir"], config["blob_dir"])
+
+# Instrumentasi waktu ([metrics] di secrets.toml); nonaktif secara bawaan
+@st.cache_resource
+def get_metrics():
+    config = get_metrics_config()
+    return Metrics(config["enabled"], config["textfile"])
+
+metrics = get_metrics()
+sites = get_sites()
+site_id = st.session_state.get("site_id", sites.default)
+storage = get_storage(site_id)
+blobs = get_blob_store()
+ui_config = get_ui_config()
+image_format = get_storage_config()["image_format"]
+
+# Kolom metadata (tanpa foto) yang cukup untuk progress, daftar tugas & export
+LOG_COLUMNS = ["tanggal", "tugas", "status", "keterangan", "worker_id"]
+REPORT_COLUMNS = ["tanggal", "area", "masalah", "tipe"]
+
+def load_data(sheet_name, columns=None, start=None, end=None):
+    # start/end (YYYY-MM-DD) hanya membaca partisi bulan yang dibutuhkan.
+    # Saat backend gagal, cache mengembalikan hasil baca terakhir yang berhasil;
+    # frame kosong hanya jika sheet belum pernah terbaca sama sekali
+    with metrics.timer("load_data", sheet=sheet_name) as t:
+        awal_baca = bytes_read()
+        try:
+            return t.measure(storage.read(sheet_name, columns, start, end))
+        except Exception:
+            return pd.DataFrame(columns=columns)
+        finally:
+            t.label(sumber=read_source())
+            t.add_bytes(bytes_read() - awal_baca)
+
+def read_source():
+    # "cache" / "bertahap" / "penuh" / "basi" dari CachedStorage, supaya baris
+    # hasil cache tidak tercampur dengan yang benar-benar diambil dari backend
+    return storage.last_read()[0] if hasattr(storage, "last_read") else "backend"
+
+def load_merged(sheet_name, columns, start=None, end=None):
+    # Tampilan remote + jurnal lokal: submit yang belum tersinkron tetap terhitung
+    data = load_data(sheet_name, columns + ["id"], start, end)
+    if storage_offline():
+        st.warning("📴 Penyimpanan tidak terjangkau, menampilkan data terakhir + laporan yang menunggu sinkron.")
+    else:
+        uploads.sync()
+    merged = uploads.merge(sheet_name, data, start, end)
+    # Baris jurnal masih string; samakan tipenya dengan hasil storage
+    return merged if merged is data else normalize(merged)
+
+def storage_offline():
+    return getattr(storage, "last_error", None) is not None
+
+def load_rows(sheet_name, keys, columns):
+    # Ambil kolom foto hanya untuk baris yang sedang ditampilkan
+    with metrics.timer("load_rows", sheet=sheet_name) as t:
+        awal_baca = bytes_read()
+        try:
+            return t.measure(storage.read_rows(sheet_name, list(keys), columns))
+        except Exception:
+            return pd.DataFrame(index=list(keys), columns=columns)
+        finally:
+            t.label(sumber=read_source())
+            t.add_bytes(bytes_read() - awal_baca)
+
+def show_photos(sheet_name, key, thumbs, photos):
+    # photos = {kolom: caption}. Yang dikirim ke browser hanya thumbnail;
+    # foto penuh baru diambil & didecode saat toggle entri dibuka
+    for c, col in zip(st.columns(len(photos)), photos):
+        thumb = blobs.load(thumbs.at[key, f"{col}_thumb"])
+        if thumb: c.image(thumb, caption=photos[col])
+        else: c.caption(f"🖼️ {photos[col]}")
+    if st.toggle("Lihat foto penuh", key=f"full_{sheet_name}_{key}"):
+        fotos = load_rows(sheet_name, [key], list(photos))
+        for c, col in zip(st.columns(len(photos)), photos):
+            foto = blobs.load(fotos.at[key, col])
+            if foto: c.image(foto, caption=photos[col])
+            else: c.info(f"Tidak ada foto {photos[col].lower()}.")
+
+def photo_flags(thumbs, key, photos):
+    # Keterangan foto duplikat dari kolom "<kolom>_duplikat" (dibaca lewat load_rows)
+    flags = []
+    for col in photos:
+        flag = thumbs.at[key, f"{col}_duplikat"] if f"{col}_duplikat" in thumbs else None
+        if isinstance(flag, str) and flag:
+            flags.append(f"⚠️ Foto {photos[col].lower()} {flag}")
+    return flags
 
 def img_to_bytes(uploaded_file):
+    # (foto detail, thumbnail daftar, dHash) dari satu kali decode
     if uploaded_file:
-        img = Image.open(uploaded_file).convert("RGB")
-        img.thumbnail((500, 500))
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=50)
-        return base64.b64encode(buf.getvalue()).decode()
-    return ""
+        with metrics.timer("img_to_bytes", format=image_format) as t:
+            return t.measure(make_hashed_variants(uploaded_file, image_format))
+    return b"", b"", None
+
+def store_photo(col, uploaded_file, row, site_id):
+    # Foto masuk blob store, baris hanya menyimpan hash + referensi thumbnail.
+    # Foto yang identik/mirip foto terbaru lain (mis. sesudah = sebelum, foto
+    # kemarin) ditandai di "<kolom>_duplikat"; foto tetap disimpan apa adanya
+    if not uploaded_file:
+        return {col: "", f"{col}_thumb": ""}
+    detail, thumb, phash = img_to_bytes(uploaded_file)
+    label = " ".join(str(v) for v in (col, row.get("tugas") or row.get("area"), row.get("tanggal")) if v)
+    owner = f"{row['id']}/{col}" if row.get("id") else None
+    ref, thumb_ref, flag = get_photo_index(site_id).register(phash, owner, label, lambda: blobs.put_image(detail, thumb))
+    return {col: ref, f"{col}_thumb": thumb_ref, f"{col}_duplikat": flag}
+
+uploads = get_upload_queue(site_id)
 
 # --- LOGIKA JADWAL OTOMATIS ---
+# Aturan Harian/Mingguan/Bulanan/Tahunan ada di schedule.json ([storage]
+# schedule_file, atau schedule_file per sekolah di sites.json), dikompilasi
+# sekali per proses menjadi kalender per tanggal
+@st.cache_resource
+def load_schedule_file(path):
+    return load_schedule(path)
+
+def get_schedule():
+    return load_schedule_file(get_shard_config(site_id)["schedule_file"])
+
 def get_current_tasks():
-    now = datetime.now(jakarta_tz)
-    day = now.day
-    month = now.month
-    week_num = (day - 1) // 7 + 1
-    
-    tasks = {
-        "Harian": ["Sapu/Pel Kantor TU & Guru", "Cuci Gelas & Alat Minum", "Sapu Halaman Sekolah", "Buang Sampah Kelas", "Kamar Mandi Siswa & Guru"],
-        "Mingguan": [],
-        "Bulanan": [],
-        "Tahunan": ["Kuras Toren / Tandon Air"]
-    }
-    
-    if week_num == 1: tasks["Mingguan"] = ["Lap Kaca/Pintu: TU, Perpus, PPDB, Security"]
-    elif week_num == 2: tasks["Mingguan"] = ["Lap Kaca: Lab Komputer, Lab Biologi"]
-    elif week_num == 3: tasks["Mingguan"] = ["Lap Kaca/Pintu: Kelas XI, XII"]
-    else: tasks["Mingguan"] = ["Lap Kaca/Pintu: Kelas X, UKS, IPM"]
-    
-    cycle = (month - 1) % 5 + 1
-    if cycle == 1: tasks["Bulanan"] = ["Plafon/Laba-laba: TU, Perpus, PPDB, Gerbang, Security"]
-    elif cycle == 2: tasks["Bulanan"] = ["Plafon: Lab Komp & Bio", "Cabut Rumput Liar", "Rapikan Taman"]
-    elif cycle == 3: tasks["Bulanan"] = ["Plafon: Kelas XI & XII"]
-    elif cycle == 4: tasks["Bulanan"] = ["Plafon: Kelas X, UKS, IPM"]
-    else: tasks["Bulanan"] = ["Kuras Kolam Ikan Depan & Belakang"]
-    
-    return tasks
+    with metrics.timer("get_current_tasks", site=site_id):
+        return get_schedule().tasks_for(datetime.now(jakarta_tz).date())
 
 # --- LOGIN ---
 if 'auth' not in st.session_state:
@@ -89,56 +219,54 @@ if 'auth' not in st.session_state:
 
 if st.session_state.auth is None:
     st.markdown("<h1 style='text-align: center; font-size: 80px;'>🧹</h1>", unsafe_allow_html=True)
-    st.title("Monitoring Kebersihan SMA Muhamka")
+    st.title(f"Monitoring Kebersihan {sites.name(sites.default)}" if len(sites.ids()) == 1 else "Monitoring Kebersihan Sekolah")
+    # Pilihan sekolah hanya muncul jika ada lebih dari satu
+    login_site = st.selectbox("Sekolah", sites.ids(), format_func=sites.name) if len(sites.ids()) > 1 else sites.default
     user = st.text_input("Username")
     pw = st.text_input("Password", type="password")
     if st.button("Login"):
-        if user == "hanto" and pw == "sayapastibisa":
-            st.session_state.auth = "Pelaksana"
-            st.rerun()
-        elif user == "pengawas" and pw == "ayokitabantu":
-            st.session_state.auth = "Pengawas"
+        akun = sites.authenticate(login_site, user, pw)
+        if akun:
+            st.session_state.auth, st.session_state.worker_name = akun
+            st.session_state.site_id, st.session_state.worker_id = login_site, user
             st.rerun()
         else:
             st.error("User atau Password salah!")
 
-# --- DASHBOARD PELAKSANA (HANTO) ---
+# --- DASHBOARD PELAKSANA ---
 elif st.session_state.auth == "Pelaksana":
+    worker_id = st.session_state.worker_id
     st.markdown(f"<div class='time-box'>🕒 {get_waktu_indo()}</div>", unsafe_allow_html=True)
-    st.title("👷 Dashboard Pak Hanto")
+    st.title(f"👷 Dashboard {st.session_state.worker_name}")
+    st.caption(sites.name(site_id))
     
-    tasks = get_current_tasks()
-    logs = load_data("cleaning_logs")
-    reps = load_data("cleaning_reports")
     tgl_hari_ini = datetime.now(jakarta_tz).strftime("%Y-%m-%d")
-    
-    # Hitung Progress
-    total_tugas_list = [item for sublist in tasks.values() for item in sublist]
-    total_tugas = len(total_tugas_list)
-    done_tasks_df = logs[logs['tanggal'] == tgl_hari_ini] if not logs.empty else pd.DataFrame()
-    done_count = len(done_tasks_df)
-    persen = (done_count / total_tugas) if total_tugas > 0 else 0
+    # Laporan yang masih di jurnal ikut masuk index sebagai "menunggu sinkron"
+    dash = dashboard_data(st.session_state, tgl_hari_ini, get_current_tasks(),
+                          load_merged("cleaning_logs", LOG_COLUMNS, tgl_hari_ini, tgl_hari_ini),
+                          load_merged("cleaning_reports", REPORT_COLUMNS))
     
     col_h1, col_h2 = st.columns(2)
-    col_h1.metric("Tugas Selesai", f"{done_count} / {total_tugas}")
-    col_h2.metric("Progress", f"{int(persen*100)}%")
-    st.progress(min(persen, 1.0))
+    col_h1.metric("Tugas Selesai", f"{dash.done_count} / {dash.total}")
+    col_h2.metric("Progress", f"{int(dash.progress*100)}%")
+    st.progress(min(dash.progress, 1.0))
     st.divider()
     
     tab1, tab2, tab3, tab4 = st.tabs(["📝 Checklist Kerja", "✅ Laporan Saya", "📣 Komplain Pengawas", "🚨 Lapor Kerusakan"])
     
-    with tab1:
+    with tab1, metrics.timer("render", tab="pelaksana/checklist"):
         st.subheader("Daftar Tugas Hari Ini")
-        for cat, items in tasks.items():
+        for cat, items in dash.tasks.items():
             if items:
                 with st.expander(f"📌 {cat}"):
                     for item in items:
-                        is_done = item in done_tasks_df['tugas'].values if not done_tasks_df.empty else False
-                        status_icon = "✅" if is_done else "⌛"
+                        status = dash.status(item)
+                        is_done, is_pending = status == DONE, status == PENDING
+                        status_icon = "✅" if is_done else "🔄" if is_pending else "⌛"
                         
                         col_text, col_btn = st.columns([3, 1])
                         col_text.write(f"{status_icon} {item}")
-                        if not is_done:
+                        if not is_done and not is_pending:
                             if col_btn.button("Update", key=f"upd_{item}"):
                                 st.session_state.active_task = item
                                 st.rerun()
@@ -150,38 +278,47 @@ elif st.session_state.auth == "Pelaksana":
             f2 = st.camera_input("Foto SESUDAH", key="cam2")
             ket = st.text_input("Keterangan/Kendala")
             if st.button("Simpan Laporan Sekarang", type="primary"):
-                if f1 and f2:
-                    save_data("cleaning_logs", pd.DataFrame([{
+                if f1 and f2 and f1.getvalue() == f2.getvalue():
+                    st.error("Foto Sebelum & Sesudah tidak boleh sama!")
+                elif f1 and f2:
+                    # Langsung kembali; encode foto & kirim ke storage di latar belakang
+                    # id = (tanggal, tugas): klik ganda / rerun menimpa baris yang sama
+                    uploads.submit("cleaning_logs", {
+                        "id": row_id(tgl_hari_ini, st.session_state.active_task),
                         "tanggal": tgl_hari_ini,
                         "tugas": st.session_state.active_task,
-                        "sebelum": img_to_bytes(f1),
-                        "sesudah": img_to_bytes(f2),
-                        "keterangan": ket, "status": "Selesai"
-                    }]))
-                    st.success("Berhasil disimpan!")
+                        "keterangan": ket, "status": "Selesai",
+                        "site_id": site_id, "worker_id": worker_id,
+                    }, {"sebelum": f1.getvalue(), "sesudah": f2.getvalue()})
+                    dash.index.add(tgl_hari_ini, st.session_state.active_task, PENDING, overwrite=False)
+                    st.success("Laporan masuk antrean!")
                     del st.session_state.active_task
                     st.rerun()
                 else:
                     st.error("Wajib ambil foto Sebelum & Sesudah!")
 
-    with tab2:
+    with tab2, metrics.timer("render", tab="pelaksana/laporan_saya"):
         st.subheader("Riwayat Pekerjaan Hari Ini")
-        if not done_tasks_df.empty:
-            for _, r in done_tasks_df.iterrows():
-                st.success(f"✔️ {r['tugas']} (Selesai)")
+        if not dash.done_logs.empty or not dash.pending_logs.empty:
+            for _, r in dash.done_logs.iterrows():
+                # Tugas sekolah yang sama bisa dikerjakan petugas lain
+                oleh = r['worker_id'] if isinstance(r['worker_id'], str) and r['worker_id'] not in ("", worker_id) else None
+                st.success(f"✔️ {r['tugas']} (Selesai{f' oleh {oleh}' if oleh else ''})")
+            for _, r in dash.pending_logs.iterrows():
+                st.info(f"🔄 {r['tugas']} (menunggu sinkron)")
+            if uploads.last_error is not None and not dash.pending_logs.empty:
+                st.caption("Koneksi ke penyimpanan gagal, laporan akan dikirim ulang otomatis.")
         else:
             st.info("Belum ada tugas yang dilaporkan hari ini.")
 
-    with tab3:
+    with tab3, metrics.timer("render", tab="pelaksana/komplain"):
         st.subheader("Instruksi Pengawas")
-        if not reps.empty:
-            komplain = reps[reps['tipe'] == "Komplain Pengawas"].sort_index(ascending=False)
-            if not komplain.empty:
-                for _, k in komplain.head(5).iterrows():
-                    st.warning(f"📍 **{k['area']}**: {k['masalah']} ({k['tanggal']})")
-            else: st.write("Belum ada komplain.")
-
-    with tab4:
+        if not dash.komplain.empty:
+            for _, k in dash.komplain.head(5).iterrows():
+                st.warning(f"📍 **{k['area']}**: {k['masalah']} ({format_date(k['tanggal'])})")
+        else: st.write("Belum ada komplain.")
+
+    with tab4, metrics.timer("render", tab="pelaksana/lapor_kerusakan"):
         st.subheader("Laporan Kerusakan/Temuan")
         if 'show_form_rusak' not in st.session_state:
             st.session_state.show_form_rusak = False
@@ -196,10 +333,12 @@ elif st.session_state.auth == "Pelaksana":
                 # Kamera mendukung switch depan/belakang
                 foto = st.camera_input("Foto Bukti Kerusakan")
                 if st.form_submit_button("Kirim Laporan"):
-                    save_data("cleaning_reports", pd.DataFrame([{
+                    uploads.submit("cleaning_reports", {
+                        "id": row_id(tgl_hari_ini, area, masalah, "Temuan Pelaksana"),
                         "tanggal": tgl_hari_ini,
-                        "area": area, "masalah": masalah, "foto": img_to_bytes(foto), "tipe": "Temuan Pelaksana"
-                    }]))
+                        "area": area, "masalah": masalah, "foto": "", "foto_thumb": "", "tipe": "Temuan Pelaksana",
+                        "site_id": site_id, "worker_id": worker_id,
+                    }, {"foto": foto.getvalue() if foto else None})
                     st.success("Laporan terkirim!")
                     st.session_state.show_form_rusak = False
                     st.rerun()
@@ -208,79 +347,231 @@ elif st.session_state.auth == "Pelaksana":
 elif st.session_state.auth == "Pengawas":
     st.markdown(f"<div class='time-box'>🕒 {get_waktu_indo()}</div>", unsafe_allow_html=True)
     st.title("🔍 Menu Pengawas")
-    logs = load_data("cleaning_logs")
-    reps = load_data("cleaning_reports")
-    
-    t_today = get_current_tasks()
-    total_tugas = sum(len(v) for v in t_today.values())
+    st.caption(sites.name(site_id))
     tgl_hari_ini = datetime.now(jakarta_tz).strftime("%Y-%m-%d")
-    done = len(logs[logs['tanggal'] == tgl_hari_ini]) if not logs.empty else 0
-    persen = (done / total_tugas) if total_tugas > 0 else 0
-    
-    col_p1, col_p2 = st.columns(2)
-    col_p1.metric("Progress Hari Ini", f"{done} / {total_tugas}")
-    col_p2.metric("Persentase", f"{int(persen*100)}%")
-    st.progress(min(persen, 1.0))
+    feed = get_change_feed(site_id)
+    # Rerun penuh: log hari ini dimuat sekali (cache menyinkron bertahap) dan
+    # kursor feed dimulai; fragment live_progress di bawah hanya menerapkan
+    # baris baru dari feed ke index sesi ini tanpa membaca storage lagi
+    cursor = feed.cursor()
+    logs = load_data("cleaning_logs", LOG_COLUMNS, tgl_hari_ini, tgl_hari_ini)
+    dash = dashboard_data(st.session_state, tgl_hari_ini, get_current_tasks(),
+                          logs, load_merged("cleaning_reports", REPORT_COLUMNS))
+    # Index sesi ini sendiri: fragment menambah baris ke dalamnya
+    live = st.session_state.live = {
+        "tanggal": tgl_hari_ini, "index": TaskIndex.from_logs(logs),
+        "cursor": cursor, "cursor_reports": cursor, "baru": [],
+    }
+    total_tugas = dash.total
+    index = live["index"]
+
+    @st.fragment(run_every=ui_config["live_interval"])
+    def live_progress():
+        live = st.session_state.live
+        cursor, rows = feed.since(live["cursor"], "cleaning_logs")
+        cursor_reports, reports = feed.since(live["cursor_reports"], "cleaning_reports")
+        if rows is None or reports is None or datetime.now(jakarta_tz).strftime("%Y-%m-%d") != live["tanggal"]:
+            # Tertinggal dari buffer feed atau hari berganti: muat ulang halaman
+            st.rerun()
+        for r in rows:
+            if str(r.get("tanggal")) == live["tanggal"]:
+                live["index"].add(r["tanggal"], r["tugas"], r.get("status") or DONE, r.get("id"))
+                live["baru"].append(str(r["tugas"]))
+        for r in reports:
+            if r.get("tipe") == "Temuan Pelaksana":
+                st.toast(f"🚨 Temuan baru: {r.get('area', '')}")
+        live["cursor"], live["cursor_reports"] = cursor, cursor_reports
 
-    t1, t2, t3, t4, t5 = st.tabs(["📊 Histori Foto", "📋 Daftar Tugas", "📥 Export Data", "🛠️ Laporan Perbaikan", "📣 Komplain"])
+        done = live["index"].done_count(live["tanggal"])
+        persen = (done / total_tugas) if total_tugas > 0 else 0
+        col_p1, col_p2 = st.columns(2)
+        col_p1.metric("Progress Hari Ini", f"{done} / {total_tugas}")
+        col_p2.metric("Persentase", f"{int(persen*100)}%")
+        st.progress(min(persen, 1.0))
+        if live["baru"]:
+            st.caption(f"🟢 Baru masuk: {', '.join(live['baru'][-5:])}")
+
+    live_progress()
+
+    t1, t2, t3, t4, t5, t6 = st.tabs(["📊 Histori Foto", "📋 Daftar Tugas", "📥 Export Data", "🛠️ Laporan Perbaikan", "📣 Komplain", "📈 Analitik"])
     
-    with t1:
+    with t1, metrics.timer("render", tab="pengawas/histori_foto"):
         f_tgl = st.date_input("Pilih Tanggal", value=datetime.now(jakarta_tz))
         target_date = f_tgl.strftime("%Y-%m-%d")
-        if not logs.empty:
-            view = logs[logs['tanggal'] == target_date]
-            if not view.empty:
-                for _, r in view.iterrows():
-                    with st.expander(f"✅ {r['tugas']}"):
-                        c1, c2 = st.columns(2)
-                        if r['sebelum']: c1.image(f"data:image/jpeg;base64,{r['sebelum']}", caption="Sebelum")
-                        if r['sesudah']: c2.image(f"data:image/jpeg;base64,{r['sesudah']}", caption="Sesudah")
-                        st.write(f"Ket: {r['keterangan']}")
-            else: st.info("Tidak ada data pembersihan.")
-
-    with t2:
-        st.subheader("Tugas yang Harus Dikerjakan Hanto")
-        for cat, items in t_today.items():
+        # Satu baca (dan satu entri cache) per bulan, hanya partisi bulan itu;
+        # tanggal terpilih dipotong dari frame terurut dengan date_slice
+        bulan = pd.Period(target_date, "M")
+        view = date_slice(load_data("cleaning_logs", LOG_COLUMNS, bulan.start_time.strftime("%Y-%m-%d"),
+                                    bulan.end_time.strftime("%Y-%m-%d")), target_date, target_date)
+        if not view.empty:
+            thumbs = load_rows("cleaning_logs", view.index, ["sebelum_thumb", "sesudah_thumb", "sebelum_duplikat", "sesudah_duplikat"])
+            for key, r in view.iterrows():
+                flags = photo_flags(thumbs, key, {"sebelum": "Sebelum", "sesudah": "Sesudah"})
+                with st.expander(f"{'⚠️' if flags else '✅'} {r['tugas']}"):
+                    show_photos("cleaning_logs", key, thumbs, {"sebelum": "Sebelum", "sesudah": "Sesudah"})
+                    for flag in flags: st.warning(flag)
+                    st.write(f"Ket: {r['keterangan']}")
+                    if isinstance(r['worker_id'], str) and r['worker_id']: st.caption(f"Petugas: {r['worker_id']}")
+        else: st.info("Tidak ada data pembersihan.")
+
+    with t2, metrics.timer("render", tab="pengawas/daftar_tugas"):
+        st.subheader("Tugas Pelaksana Hari Ini")
+        for cat, items in dash.tasks.items():
             if items:
                 with st.expander(f"📅 {cat}"):
                     for i, item in enumerate(items, 1):
-                        is_done = not logs[(logs['tanggal'] == tgl_hari_ini) & (logs['tugas'] == item)].empty if not logs.empty else False
+                        is_done = index.is_done(tgl_hari_ini, item)
                         st.write(f"{'✅' if is_done else '⌛'} {i}. {item}")
 
-    with t3:
+    with t3, metrics.timer("render", tab="pengawas/export"):
         st.subheader("📥 Export Laporan")
-        if not logs.empty:
-            df_export = logs.copy().drop(columns=['sebelum', 'sesudah'], errors='ignore')
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df_export.to_excel(writer, index=False, sheet_name='Laporan')
-            st.download_button(label="Download Excel", data=output.getvalue(), file_name="Laporan_Kebersihan.xlsx")
-            st.dataframe(df_export)
-
-    with t4:
-        st.subheader("Laporan Temuan dari Pak Hanto")
-        if not reps.empty:
-            # Filter hanya temuan pelaksana
-            temuan = reps[reps['tipe'] == "Temuan Pelaksana"].sort_index(ascending=False)
-            if not temuan.empty:
-                for _, r in temuan.iterrows():
-                    with st.expander(f"🚨 {r['area']} - {r['tanggal']}"):
-                        st.write(f"**Masalah:** {r['masalah']}")
-                        if 'foto' in r and r['foto']:
-                            st.image(f"data:image/jpeg;base64,{r['foto']}", caption="Bukti Kerusakan")
-                        else:
-                            st.info("Tidak ada foto bukti.")
+        hari_ini = datetime.now(jakarta_tz).date()
+        rentang_export = st.date_input("Rentang Tanggal", value=(hari_ini.replace(day=1), hari_ini), key="rentang_export")
+        fmt = st.selectbox("Format", available_formats())
+        if len(rentang_export) == 2 and st.button("Siapkan File Export"):
+            awal, akhir = (d.strftime("%Y-%m-%d") for d in rentang_export)
+            # Baris dialirkan dari storage per potongan langsung ke file sementara
+            fd, path = tempfile.mkstemp(suffix=f".{FORMATS[fmt]}")
+            os.close(fd)
+            chunks = storage.iter_chunks("cleaning_logs", LOG_COLUMNS, awal, akhir)
+            with st.spinner("Menyiapkan file..."):
+                jumlah = export_rows(chunks, LOG_COLUMNS, fmt, path)
+            lama = st.session_state.get("export_file")
+            if lama and os.path.exists(lama[0]):
+                os.remove(lama[0])
+            st.session_state.export_file = (path, f"Laporan_Kebersihan_{awal}_{akhir}.{FORMATS[fmt]}", jumlah)
+        if "export_file" in st.session_state and os.path.exists(st.session_state.export_file[0]):
+            path, nama, jumlah = st.session_state.export_file
+            st.caption(f"{jumlah} baris siap diunduh.")
+            with open(path, "rb") as f:
+                st.download_button(label=f"Download {nama}", data=f, file_name=nama)
+
+        st.markdown("##### 🗂️ Laporan Lengkap (dengan foto)")
+        st.caption("ZIP berisi folder per tanggal dengan foto sebelum/sesudah dan index.csv.")
+        if len(rentang_export) == 2 and st.button("Buat Laporan Lengkap"):
+            awal, akhir = (d.strftime("%Y-%m-%d") for d in rentang_export)
+            chunks = storage.iter_chunks("cleaning_logs", BUNDLE_COLUMNS, awal, akhir)
+            st.session_state.bundle_key = get_bundle_jobs().submit(chunks, awal, akhir)
+
+        # Selama berjalan, progress dicek ulang tiap 2 detik tanpa menjalankan
+        # ulang seluruh halaman; begitu status berubah halaman dirender ulang
+        # sekali dan polling berhenti
+        @st.fragment(run_every=2)
+        def bundle_progress(key):
+            state = get_bundle_jobs().status(key)
+            if state[0] != "berjalan":
+                st.rerun()
+            done, total = state[1], state[2]
+            st.progress(done / total if total else 0.0, text=f"Menyusun foto {done} / {total}")
+
+        if "bundle_key" in st.session_state:
+            key = st.session_state.bundle_key
+            state = get_bundle_jobs().status(key)
+            if state[0] == "selesai":
+                with open(state[1], "rb") as f:
+                    st.download_button("Download Laporan Lengkap", data=f, file_name=f"Laporan_Lengkap_{key.rsplit('_', 1)[0]}.zip")
+            elif state[0] == "gagal":
+                st.error(f"Gagal membuat laporan: {state[1]}")
+            elif state[0] == "kedaluwarsa":
+                st.info("Arsip laporan sebelumnya sudah dihapus, silakan buat ulang.")
+                del st.session_state.bundle_key
             else:
-                st.info("Tidak ada laporan kerusakan.")
+                bundle_progress(key)
+
+        if len(rentang_export) == 2:
+            # Pratinjau = potongan pertama iter_chunks (100 baris), bukan seluruh
+            # rentang; dimemo per sesi per rentang supaya rerun tidak membaca ulang
+            awal, akhir = (d.strftime("%Y-%m-%d") for d in rentang_export)
+            memo = st.session_state.get("export_preview")
+            if memo is None or memo[0] != (awal, akhir):
+                with metrics.timer("iter_chunks", sheet="cleaning_logs") as t:
+                    awal_baca = bytes_read()
+                    chunks = storage.iter_chunks("cleaning_logs", LOG_COLUMNS, awal, akhir, chunk_size=100)
+                    try:
+                        preview = t.measure(next(chunks, pd.DataFrame(columns=LOG_COLUMNS)))
+                    except Exception:
+                        preview = pd.DataFrame(columns=LOG_COLUMNS)
+                    finally:
+                        chunks.close()
+                        t.add_bytes(bytes_read() - awal_baca)
+                memo = ((awal, akhir), preview)
+                st.session_state.export_preview = memo
+            st.dataframe(memo[1], hide_index=True)
+
+    with t4, metrics.timer("render", tab="pengawas/laporan_perbaikan"):
+        st.subheader("Laporan Temuan dari Pelaksana")
+        temuan = dash.temuan
+        if not temuan.empty:
+            # Paginasi: thumbnail hanya diambil untuk halaman yang tampil
+            page_size = ui_config["page_size"]
+            pages = (len(temuan) - 1) // page_size + 1
+            page = st.number_input(f"Halaman (dari {pages})", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+            temuan = temuan.iloc[(page - 1) * page_size:page * page_size]
+            thumbs = load_rows("cleaning_reports", [k for k in temuan.index if not is_journal_key(k)], ["foto_thumb", "foto_duplikat"])
+            for key, r in temuan.iterrows():
+                with st.expander(f"🚨 {r['area']} - {format_date(r['tanggal'])}"):
+                    st.write(f"**Masalah:** {r['masalah']}")
+                    if is_journal_key(key): st.caption("🔄 Foto menunggu sinkron")
+                    else:
+                        show_photos("cleaning_reports", key, thumbs, {"foto": "Bukti Kerusakan"})
+                        for flag in photo_flags(thumbs, key, {"foto": "Bukti Kerusakan"}): st.warning(flag)
+        else:
+            st.info("Tidak ada laporan kerusakan.")
 
-    with t5:
+    with t5, metrics.timer("render", tab="pengawas/komplain"):
         with st.form("f_komplain"):
             loc = st.text_input("Lokasi Kotor")
             det = st.text_area("Instruksi")
-            if st.form_submit_button("Kirim ke Hanto"):
-                save_data("cleaning_reports", pd.DataFrame([{"tanggal": tgl_hari_ini, "area": loc, "masalah": det, "foto": "", "tipe": "Komplain Pengawas"}]))
+            if st.form_submit_button("Kirim ke Pelaksana"):
+                # Lewat jurnal juga: komplain tidak hilang saat backend sedang gagal
+                uploads.submit("cleaning_reports", {"id": row_id(tgl_hari_ini, loc, det, "Komplain Pengawas"), "tanggal": tgl_hari_ini, "area": loc, "masalah": det, "foto": "", "tipe": "Komplain Pengawas", "site_id": site_id, "worker_id": st.session_state.worker_id})
                 st.error("Terkirim!")
 
+    with t6, metrics.timer("render", tab="pengawas/analitik"):
+        st.subheader("Analitik Penyelesaian Tugas")
+        hari_ini = datetime.now(jakarta_tz).date()
+        rentang = st.date_input("Rentang Tanggal", value=(hari_ini.replace(day=1), hari_ini), key="rentang_analitik")
+        if len(rentang) == 2:
+            # Jadwal terurai per periode utuh + log digabung sekali, lalu
+            # diagregasi per hari/minggu/bulan. Log hanya dibaca dari awal
+            # periode paling awal sampai jendela keterlambatan (paling jauh
+            # hari ini), bukan seluruh histori
+            awal, akhir = (d.strftime("%Y-%m-%d") for d in rentang)
+            jadwal = occurrences(get_schedule().tasks_between(*period_span(awal, akhir)), awal, akhir)
+            span = report_span(jadwal, hari_ini)
+            logs_rentang = load_data("cleaning_logs", ["tanggal", "tugas", "status"], *span) if span else pd.DataFrame(columns=["tanggal", "tugas", "status"])
+            data = completion_frame(jadwal, logs_rentang, hari_ini)
+            harian, mingguan, bulanan = (completion_rates(data, f) for f in ("D", "W", "M"))
+            dinilai = data[~data['berjalan']]
+            total = dinilai['selesai'].mean() * 100 if not dinilai.empty else 0
+            col_a1, col_a2, col_a3 = st.columns(3)
+            col_a1.metric("Tepat Waktu (rentang)", f"{int(total)}%")
+            col_a2.metric("Jadwal Tidak Dikerjakan", int((~dinilai['selesai'] & dinilai['terlambat_hari'].isna()).sum()))
+            col_a3.metric("Sedang Berjalan", int(data['berjalan'].sum()))
+            st.caption("Persentase selesai per hari")
+            st.line_chart(harian['persen'])
+            st.caption("Persentase selesai per minggu")
+            st.bar_chart(mingguan['persen'])
+            st.caption("Persentase selesai per bulan")
+            st.bar_chart(bulanan['persen'])
+            st.caption("Keterlambatan per tugas (hari)")
+            st.dataframe(task_lateness(data), hide_index=True)
+
+    # Panel tersembunyi, dibuka lewat URL ?diagnostik=1
+    if st.query_params.get("diagnostik") == "1":
+        with st.expander("🩺 Diagnostik", expanded=True):
+            if not metrics.enabled:
+                st.info("Instrumentasi nonaktif. Aktifkan lewat [metrics] enabled = true atau env METRICS_ENABLED=1.")
+            else:
+                st.dataframe(metrics.snapshot(), hide_index=True)
+                st.download_button("Download metrics.prom", data=metrics.to_prometheus(), file_name="metrics.prom")
+            if hasattr(storage, "stats"):
+                st.caption(f"Cache storage: {storage.stats()}")
+            st.caption(f"Antrean unggah: {len(uploads.pending('cleaning_logs')) + len(uploads.pending('cleaning_reports'))} entri, error terakhir: {uploads.last_error}")
+
+metrics.write_textfile()
+
 if st.sidebar.button("Logout"):
-    st.session_state.auth = None
+    for k in ("auth", "site_id", "worker_id", "worker_name"):
+        st.session_state.pop(k, None)
     st.rerun()
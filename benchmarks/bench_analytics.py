@@ -0,0 +1,56 @@
+"""Waktu analitik penyelesaian atas histori bertahun-tahun.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_analytics --years 1 3 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import completion_frame, completion_rates, occurrences, period_span, task_lateness  # noqa: E402
+from schedule import load_schedule  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_logs(expanded, done_rate, seed=0):
+    # Sebagian jadwal dikerjakan tepat hari, sebagian lagi 1-3 hari kemudian
+    rng = np.random.default_rng(seed)
+    logs = expanded[rng.random(len(expanded)) < done_rate][["tanggal", "tugas"]].copy()
+    shift = rng.choice([0, 0, 0, 1, 2, 3], size=len(logs))
+    logs["tanggal"] = (np.array(logs["tanggal"], dtype="datetime64[D]") + shift).astype(str)
+    logs["status"] = "Selesai"
+    return logs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--done-rate", type=float, default=0.85)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    schedule = load_schedule(os.path.join(ROOT, "schedule.json"))
+    print(f"{'tahun':>6} {'jadwal':>8} {'log':>8} {'ms total':>10}")
+    for years in args.years:
+        start, end = f"{2026 - years}-01-01", "2025-12-31"
+        logs = make_logs(schedule.tasks_between(start, end), args.done_rate)
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            jadwal = occurrences(schedule.tasks_between(*period_span(start, end)), start, end)
+            data = completion_frame(jadwal, logs, end)
+            for freq in ("D", "W", "M"):
+                completion_rates(data, freq)
+            task_lateness(data)
+            best = min(best, time.perf_counter() - t0)
+        print(f"{years:>6} {len(data):>8} {len(logs):>8} {best * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
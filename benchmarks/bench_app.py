@@ -0,0 +1,167 @@
+"""Waktu & memori per rerun dashboard lewat Streamlit AppTest.
+
+Data sintetis beberapa tahun (benchmarks/synthetic.py) diisi ke
+FakeGSheetsConnection yang meniru latency + bandwidth, lalu setiap
+skenario login dan menjalankan jalur dashboard seperti pengguna:
+Pelaksana (checklist), Pengawas histori foto, Pengawas export.
+Versi lama (OK-V1..V5) bisa diukur dengan data yang sama untuk pembanding.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_app --years 3 --latency 0.2 --bandwidth 2e6
+    python -m benchmarks.bench_app --app OK-V5-app.py
+    python -m benchmarks.bench_app --max-seconds 2   # exit 1 jika rerun hangat lebih lambat
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from benchmarks.fake_gsheets import FakeGSheetsConnection  # noqa: E402
+from benchmarks.synthetic import generate_logs, generate_reports, legacy_frame  # noqa: E402
+from blobstore import BlobStore  # noqa: E402
+from storage import create_storage  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USERS = {"pelaksana": ("hanto", "sayapastibisa"), "pengawas": ("pengawas", "ayokitabantu")}
+
+
+def is_legacy(app):
+    return os.path.basename(app).startswith("OK-V")
+
+
+def prepare(args, tmp):
+    # Isi data tanpa jeda jaringan, lalu aktifkan jeda untuk pengukuran
+    os.environ.update({
+        "STORAGE_BACKEND": args.backend,
+        "STORAGE_PATH": os.path.join(tmp, "bench.db"),
+        "BLOB_DIR": os.path.join(tmp, "blobs"),
+        "SPOOL_DIR": os.path.join(tmp, "spool"),
+        "BUNDLE_DIR": os.path.join(tmp, "bundles"),
+        "SCHEDULE_FILE": os.path.join(ROOT, "schedule.json"),
+    })
+    conn = FakeGSheetsConnection()
+    photos = "inline" if is_legacy(args.app) else args.photos
+    blobs = BlobStore(os.environ["BLOB_DIR"]) if photos == "blob" else None
+    logs = generate_logs(args.years, photos=photos, blob_store=blobs)
+    reports = generate_reports(args.years, photos=photos, blob_store=blobs)
+    if is_legacy(args.app):
+        conn.seed("cleaning_logs", legacy_frame(logs))
+        conn.seed("cleaning_reports", legacy_frame(reports))
+    else:
+        storage = create_storage({"backend": args.backend, "path": os.environ["STORAGE_PATH"], "cache_ttl": 0},
+                                 lambda: conn)
+        storage.append("cleaning_logs", logs)
+        storage.append("cleaning_reports", reports)
+    conn.set_network(args.latency, args.bandwidth)
+    return conn, len(logs), len(reports)
+
+
+def by_label(widgets, label):
+    return next((w for w in widgets if w.label == label), None)
+
+
+def login(at, role):
+    user, pw = USERS[role]
+    at.run()
+    by_label(at.text_input, "Username").input(user)
+    by_label(at.text_input, "Password").input(pw)
+    by_label(at.button, "Login").click()
+    return at.run()
+
+
+def measure(conn, step, reset=lambda: None):
+    # Waktu tanpa tracemalloc (overhead-nya besar), memori di putaran kedua
+    reset()
+    conn.reset_stats()
+    t0 = time.perf_counter()
+    at = step()
+    elapsed = time.perf_counter() - t0
+    read = conn.stats["bytes_read"]
+    reset()
+    tracemalloc.start()
+    step()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed, peak, read
+
+
+def clear_caches():
+    # Rerun "dingin" = pengguna pertama pagi itu, belum ada cache sama sekali
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
+def scenarios(app, timeout):
+    def fresh(role):
+        clear_caches()
+        return login(AppTest.from_file(app, default_timeout=timeout), role)
+
+    past = date.today() - timedelta(days=30)
+
+    def histori(at):
+        by_label(at.date_input, "Pilih Tanggal").set_value(past)
+        return at
+
+    def export(at):
+        button = by_label(at.button, "Siapkan File Export")
+        if button is not None:
+            # Versi lama membangun Excel di setiap rerun tanpa tombol
+            button.click()
+        return at
+
+    return {
+        "pelaksana checklist": ("pelaksana", lambda at: at),
+        "pengawas histori": ("pengawas", histori),
+        "pengawas export": ("pengawas", export),
+    }, fresh
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--backend", choices=["gsheets", "sqlite"], default="gsheets")
+    parser.add_argument("--photos", choices=["blob", "inline"], default="blob")
+    parser.add_argument("--latency", type=float, default=0.2, help="detik per request")
+    parser.add_argument("--bandwidth", type=float, default=2e6, help="byte/detik, 0 = tanpa batas")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--max-seconds", type=float, help="batas waktu rerun hangat")
+    args = parser.parse_args()
+    args.bandwidth = args.bandwidth or None
+    app = os.path.join(ROOT, args.app)
+
+    tmp = tempfile.mkdtemp()
+    conn, n_logs, n_reports = prepare(args, tmp)
+    print(f"{args.app}: {n_logs} log, {n_reports} laporan, {args.years} tahun, "
+          f"latency {args.latency}s, bandwidth {args.bandwidth or '-'} B/s")
+    print(f"{'skenario':<22} {'rerun':>6} {'detik':>8} {'MB puncak':>10} {'KB dibaca':>10}")
+
+    steps, fresh = scenarios(app, args.timeout)
+    slow = []
+    with mock.patch("streamlit.connection", lambda *a, **k: conn):
+        for name, (role, action) in steps.items():
+            at = fresh(role)
+            for rerun, reset in (("dingin", clear_caches), ("hangat", lambda: None)):
+                elapsed, peak, read = measure(conn, lambda: action(at).run(), reset)
+                print(f"{name:<22} {rerun:>6} {elapsed:>8.2f} {peak / 2 ** 20:>10.1f} {read / 1024:>10.0f}")
+                if rerun == "hangat" and args.max_seconds and elapsed > args.max_seconds:
+                    slow.append(name)
+
+    if slow:
+        print(f"LAMBAT (> {args.max_seconds}s): {', '.join(slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
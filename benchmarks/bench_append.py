@@ -0,0 +1,75 @@
+"""Latensi submit checklist: read-concat-update lama vs append-only.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_append --sizes 1000 10000 100000
+"""
+import argparse
+import base64
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_gsheets import FakeGSheetsConnection  # noqa: E402
+from storage import GSheetsStorage  # noqa: E402
+
+
+def make_logs(n, photo_bytes):
+    foto = base64.b64encode(os.urandom(photo_bytes)).decode()
+    tanggal = pd.date_range("2020-01-01", periods=max(n // 8, 1), freq="D").strftime("%Y-%m-%d")
+    return pd.DataFrame({
+        "tanggal": [tanggal[i // 8 % len(tanggal)] for i in range(n)],
+        "tugas": [f"Tugas {i % 8}" for i in range(n)],
+        "sebelum": foto, "sesudah": foto,
+        "keterangan": "", "status": "Selesai",
+    })
+
+
+def legacy_save(conn, sheet_name, data):
+    # Jalur lama app.py: baca seluruh sheet, concat, tulis ulang
+    existing_df = conn.read(worksheet=sheet_name, ttl="0s")
+    updated_df = pd.concat([existing_df, data], ignore_index=True)
+    conn.update(worksheet=sheet_name, data=updated_df)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--photo-bytes", type=int, default=512)
+    args = parser.parse_args()
+
+    row = make_logs(1, args.photo_bytes)
+    print(f"{'baris':>8} {'lama (ms)':>12} {'append (ms)':>12} {'KB lama':>10} {'KB append':>10}")
+    for n in args.sizes:
+        history = make_logs(n, args.photo_bytes)
+
+        conn = FakeGSheetsConnection()
+        conn.seed("cleaning_logs", history)
+        t_old = timed(lambda: legacy_save(conn, "cleaning_logs", row), args.repeat)
+        kb_old = (conn.stats["bytes_read"] + conn.stats["bytes_written"]) / args.repeat / 1024
+
+        conn = FakeGSheetsConnection()
+        conn.seed("cleaning_logs", history)
+        storage = GSheetsStorage(conn)
+        t_new = timed(lambda: storage.append("cleaning_logs", row), args.repeat)
+        kb_new = (conn.stats["bytes_read"] + conn.stats["bytes_written"]) / args.repeat / 1024
+
+        print(f"{n:>8} {t_old * 1000:>12.2f} {t_new * 1000:>12.2f} {kb_old:>10.1f} {kb_new:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Uji beban tulis bersamaan: read-concat-update lama vs jalur CAS + upsert.
+
+Setiap thread meniru satu sesi/proses dengan tumpukan storage sendiri dan
+mengirim baris unik miliknya plus sekumpulan baris "bersama" (id sama di
+semua thread, seperti klik ganda dari dua perangkat). Hasil akhir harus
+berisi tepat satu baris per id.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_concurrency --threads 8 --rows 25
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_gsheets import FakeGSheetsConnection  # noqa: E402
+from storage import GSheetsStorage, KeyedStorage, SQLiteStorage, row_id  # noqa: E402
+
+SHEET = "cleaning_reports"
+
+
+def make_row(*parts):
+    return pd.DataFrame([{
+        "id": row_id(*parts), "tanggal": "2026-10-17", "area": "-".join(map(str, parts)),
+        "masalah": "uji beban", "foto": "", "tipe": "Temuan Pelaksana",
+    }])
+
+
+def legacy_save(conn, data):
+    # Jalur lama app.py: baca seluruh sheet, concat, tulis ulang
+    existing_df = conn.read(worksheet=SHEET, ttl="0s")
+    conn.update(worksheet=SHEET, data=pd.concat([existing_df, data], ignore_index=True))
+
+
+def run(threads, rows, shared, submit):
+    barrier = threading.Barrier(threads)
+    errors = []
+
+    def worker(t):
+        barrier.wait()
+        try:
+            for i in range(rows):
+                submit(t, make_row("thread", t, i))
+                if i < shared:
+                    submit(t, make_row("shared", i))
+        except Exception as e:
+            errors.append(e)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    t0 = time.perf_counter()
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    return time.perf_counter() - t0, errors
+
+
+def report(name, elapsed, errors, data, expected):
+    ids = data["id"].astype(str)
+    lost = expected - ids.nunique()
+    dupes = len(ids) - ids.nunique()
+    status = "OK" if lost == 0 and dupes == 0 and not errors else "GAGAL"
+    print(f"{name:>10} {elapsed:>8.2f} {len(ids):>7} {lost:>7} {dupes:>9} {len(errors):>6}  {status}")
+    return status == "OK"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=25)
+    parser.add_argument("--shared", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.002)
+    args = parser.parse_args()
+    expected = args.threads * args.rows + args.shared
+    print(f"{'jalur':>10} {'detik':>8} {'baris':>7} {'hilang':>7} {'duplikat':>9} {'error':>6}")
+
+    conn = FakeGSheetsConnection(latency=args.latency)
+    conn.seed(SHEET, make_row("seed").iloc[0:0])
+    elapsed, errors = run(args.threads, args.rows, args.shared, lambda t, row: legacy_save(conn, row))
+    report("lama", elapsed, errors, conn.read(worksheet=SHEET), expected)
+
+    ok = True
+    conn = FakeGSheetsConnection(latency=args.latency)
+    stacks = [KeyedStorage(GSheetsStorage(conn)) for _ in range(args.threads)]
+    elapsed, errors = run(args.threads, args.rows, args.shared, lambda t, row: stacks[t].append(SHEET, row))
+    ok &= report("gsheets", elapsed, errors, stacks[0].read(SHEET), expected)
+
+    path = os.path.join(tempfile.mkdtemp(), "stress.db")
+    stacks = [KeyedStorage(SQLiteStorage(path)) for _ in range(args.threads)]
+    elapsed, errors = run(args.threads, args.rows, args.shared, lambda t, row: stacks[t].append(SHEET, row))
+    ok &= report("sqlite", elapsed, errors, stacks[0].read(SHEET), expected)
+    print(f"konflik CAS yang digabung ulang (sqlite): {sum(s.conflicts for s in stacks)}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
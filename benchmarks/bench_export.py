@@ -0,0 +1,80 @@
+"""Memori puncak & waktu export: Excel in-memory lama vs export bertahap.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_export --rows 100000 300000
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export import available_formats, export_rows  # noqa: E402
+from storage import PartitionedStorage, SQLiteStorage  # noqa: E402
+
+COLUMNS = ["tanggal", "tugas", "status", "keterangan"]
+
+
+def seed(storage, n):
+    days = pd.date_range("2015-01-01", periods=n // 8 + 1, freq="D").strftime("%Y-%m-%d")
+    for i in range(0, n, 50000):
+        idx = range(i, min(i + 50000, n))
+        storage.append("cleaning_logs", pd.DataFrame({
+            "tanggal": [days[j // 8] for j in idx],
+            "tugas": [f"Tugas {j % 8}" for j in idx],
+            "status": "Selesai",
+            "keterangan": [f"catatan {j}" for j in idx],
+        }))
+
+
+def legacy_export(storage):
+    # Jalur lama: muat semua log, copy, tulis ke BytesIO
+    logs = storage.read("cleaning_logs", COLUMNS)
+    df_export = logs.copy()
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        df_export.to_excel(writer, index=False, sheet_name="Laporan")
+    return len(output.getvalue())
+
+
+def measure(fn):
+    # Waktu diukur tanpa tracemalloc (overhead-nya besar), memori di putaran kedua
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000])
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'baris':>8} {'jalur':>14} {'detik/100k':>11} {'MB puncak':>10}")
+    for n in args.rows:
+        tmp = tempfile.mkdtemp()
+        storage = PartitionedStorage(SQLiteStorage(os.path.join(tmp, "bench.db")))
+        seed(storage, n)
+        runs = {"lama (xlsx)": lambda: legacy_export(storage)}
+        for fmt in available_formats():
+            path = os.path.join(tmp, f"out.{fmt}")
+            runs[f"bertahap {fmt}"] = lambda fmt=fmt, path=path: export_rows(
+                storage.iter_chunks("cleaning_logs", COLUMNS, chunk_size=args.chunk_size), COLUMNS, fmt, path)
+        for name, fn in runs.items():
+            elapsed, peak = measure(fn)
+            print(f"{n:>8} {name:>14} {elapsed / n * 100000:>11.2f} {peak / 2 ** 20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Waktu encode & ukuran per foto: img_to_bytes lama vs imaging.make_variants.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_images --sizes 1280x720 1920x1080 4032x3024
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from imaging import make_variants  # noqa: E402
+
+
+def make_photo(width, height):
+    # Foto kamera sintetis: gradien + noise, disimpan sebagai JPEG berkualitas tinggi
+    base = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 40)
+    img = Image.merge("RGB", (base, noise, base.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=92)
+    return buf.getvalue()
+
+
+def legacy_variants(data):
+    # Jalur lama: img_to_bytes (500px q50) lalu decode ulang untuk thumbnail 96px
+    img = Image.open(io.BytesIO(data)).convert("RGB")
+    img.thumbnail((500, 500))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=50)
+    detail = buf.getvalue()
+    thumb = Image.open(io.BytesIO(detail))
+    thumb.thumbnail((96, 96))
+    buf = io.BytesIO()
+    thumb.convert("RGB").save(buf, format="JPEG", quality=60)
+    return detail, buf.getvalue()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples), out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", default=["1280x720", "1920x1080", "4032x3024"])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pipelines = {
+        "lama": legacy_variants,
+        "jpeg": lambda d: make_variants(io.BytesIO(d), "JPEG"),
+        "webp": lambda d: make_variants(io.BytesIO(d), "WEBP"),
+    }
+    print(f"{'sumber':>10} {'pipeline':>8} {'ms':>8} {'KB detail':>10} {'KB thumb':>9}")
+    for size in args.sizes:
+        width, height = (int(v) for v in size.split("x"))
+        data = make_photo(width, height)
+        for name, fn in pipelines.items():
+            t, (detail, thumb) = timed(lambda: fn(data), args.repeat)
+            print(f"{size:>10} {name:>8} {t * 1000:>8.1f} {len(detail) / 1024:>10.1f} {len(thumb) / 1024:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
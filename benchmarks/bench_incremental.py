@@ -0,0 +1,61 @@
+"""Biaya penyegaran cleaning_logs: baca ulang penuh vs sinkron bertahap.
+
+Meniru dashboard Pengawas yang menyegarkan seluruh histori setiap beberapa
+menit sementara pelaksana menambah beberapa laporan di antaranya.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_incremental --years 3 --new-rows 5 --latency 0.05
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_gsheets import FakeGSheetsConnection  # noqa: E402
+from benchmarks.synthetic import generate_logs  # noqa: E402
+from storage import create_storage, row_id  # noqa: E402
+
+COLUMNS = ["tanggal", "tugas", "status", "keterangan"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--new-rows", type=int, default=5)
+    parser.add_argument("--refreshes", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    logs = generate_logs(args.years, photos="inline").drop(columns=["sebelum", "sesudah"])
+    print(f"{len(logs)} baris, {args.new_rows} baris baru per penyegaran")
+    print(f"{'mode':>10} {'detik/segar':>12} {'KB/segar':>10}")
+    for mode in ("penuh", "bertahap"):
+        conn = FakeGSheetsConnection()
+        storage = create_storage({"backend": "gsheets", "cache_ttl": 1e-6}, lambda: conn)
+        storage.append("cleaning_logs", logs)
+        storage.read("cleaning_logs", COLUMNS)
+        conn.set_network(args.latency)
+        elapsed = read = 0
+        for r in range(args.refreshes):
+            conn.set_network(0)
+            storage.append("cleaning_logs", pd.DataFrame([{
+                "id": row_id(mode, r, i), "tanggal": "2026-10-17", "tugas": f"Baru {i}", "status": "Selesai",
+            } for i in range(args.new_rows)]))
+            conn.set_network(args.latency)
+            if mode == "penuh":
+                # Perilaku lama: cache dibuang, seluruh histori dibaca ulang
+                storage._entries.clear()
+            conn.reset_stats()
+            t0 = time.perf_counter()
+            storage.read("cleaning_logs", COLUMNS)
+            elapsed += time.perf_counter() - t0
+            read += conn.stats["bytes_read"]
+        print(f"{mode:>10} {elapsed / args.refreshes:>12.3f} {read / args.refreshes / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Memori & waktu filter: frame string hasil baca sheet vs typedframe.normalize.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_typedframe --rows 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typedframe import date_slice, normalize  # noqa: E402
+
+TASKS = [f"Tugas {i}" for i in range(17)]
+TIPE = ["Temuan Pelaksana", "Komplain Pengawas"]
+
+
+def sheet_frame(n, seed=0):
+    # Seperti hasil read(): semua kolom string, urut submit
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2010-01-01", periods=n // 8 + 1, freq="D").strftime("%Y-%m-%d").to_numpy()
+    return pd.DataFrame({
+        "tanggal": days[np.arange(n) // 8],
+        "tugas": np.array(TASKS)[rng.integers(0, len(TASKS), n)],
+        "status": np.where(rng.random(n) < 0.98, "Selesai", "menunggu sinkron"),
+        "tipe": np.array(TIPE)[rng.integers(0, 2, n)],
+        "area": np.array([f"Area {i}" for i in range(12)])[rng.integers(0, 12, n)],
+        "keterangan": "",
+    }, dtype=str)
+
+
+def best(fn, repeat=20):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000])
+    args = parser.parse_args()
+
+    print(f"{'baris':>8} {'frame':>8} {'MB/100k':>8} {'tugas==':>9} {'status!=':>9} {'rentang 30h':>12} {'normalize':>10}")
+    for n in args.rows:
+        raw = sheet_frame(n)
+        t0 = time.perf_counter()
+        typed = normalize(raw)
+        normalize_ms = (time.perf_counter() - t0) * 1000
+        mid = pd.Timestamp(raw["tanggal"].iloc[n // 2])
+        start, end = mid.strftime("%Y-%m-%d"), (mid + pd.Timedelta(days=29)).strftime("%Y-%m-%d")
+        runs = {
+            "string": (raw, lambda: raw[(raw["tanggal"] >= start) & (raw["tanggal"] <= end)]),
+            "bertipe": (typed, lambda: date_slice(typed, start, end)),
+        }
+        for name, (frame, by_date) in runs.items():
+            mb = frame.memory_usage(deep=True).sum() / 2 ** 20 / n * 100000
+            eq = best(lambda: frame[frame["tugas"] == "Tugas 3"])
+            ne = best(lambda: frame[frame["status"] != "menunggu sinkron"])
+            rng = best(by_date)
+            extra = f"{normalize_ms:>10.1f}" if name == "bertipe" else f"{'-':>10}"
+            print(f"{n:>8} {name:>8} {mb:>8.1f} {eq:>9.2f} {ne:>9.2f} {rng:>12.3f} {extra}")
+        assert len(runs["string"][1]()) == len(runs["bertipe"][1]())
+
+
+if __name__ == "__main__":
+    main()
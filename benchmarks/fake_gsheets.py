@@ -0,0 +1,187 @@
+import io
+import re
+import time
+
+import pandas as pd
+from gspread.exceptions import WorksheetNotFound
+
+
+# --- TIRUAN LOKAL GSheetsConnection ---
+# Meniru bagian API st-gsheets-connection + gspread yang dipakai storage.py.
+# Data disimpan sebagai list baris (baris pertama = header) dan setiap
+# read/update melewati serialisasi CSV supaya biaya transfer ikut terukur.
+# `latency` (detik) ditambahkan ke setiap request untuk meniru jaringan,
+# `bandwidth` (byte/detik, opsional) menambah jeda sebanding ukuran payload.
+# Seperti Sheets API, tulis nilai di luar jumlah kolom grid ditolak; hanya
+# add_cols/resize dan conn.update (set_with_dataframe) yang memperbesarnya.
+
+class FakeWorksheet:
+    def __init__(self, title, stats, latency=0.0, bandwidth=None, cols=26):
+        self.title = title
+        self.col_count = cols
+        self.rows = []
+        self.stats = stats
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def row_values(self, row):
+        return list(self.rows[row - 1]) if len(self.rows) >= row else []
+
+    def get_all_values(self):
+        _wait(self.latency, sum(len(v) for r in self.rows for v in r), self.bandwidth)
+        return [list(r) for r in self.rows]
+
+    def batch_get(self, ranges, major_dimension="ROWS", **kwargs):
+        # Hanya range satu kolom: "C5" atau "C2:C"
+        _wait(self.latency)
+        out = []
+        for rng in ranges:
+            m = re.fullmatch(r"([A-Z]+)(\d+)(?::([A-Z]+)(\d*))?", rng)
+            col = _col_index(m[1])
+            start = int(m[2])
+            end = start if m[3] is None else int(m[4]) if m[4] else len(self.rows)
+            vals = [r[col] if col < len(r) else "" for r in self.rows[start - 1:end]]
+            while vals and vals[-1] == "":
+                vals.pop()
+            self.stats["bytes_read"] += sum(len(v) for v in vals)
+            _wait(0, sum(len(v) for v in vals), self.bandwidth)
+            if not vals:
+                out.append([])
+            elif major_dimension == "COLUMNS":
+                out.append([vals])
+            else:
+                out.append([[v] for v in vals])
+        return out
+
+    def add_cols(self, cols):
+        self.col_count += cols
+
+    def resize(self, rows=None, cols=None):
+        if cols is not None:
+            self.col_count = cols
+
+    def append_rows(self, values, value_input_option="RAW", **kwargs):
+        _wait(self.latency)
+        rows = [["" if v is None else str(v) for v in r] for r in values]
+        self._check_grid(max((len(r) for r in rows), default=0) - 1)
+        self.stats["bytes_written"] += sum(len(v) for r in rows for v in r)
+        _wait(0, sum(len(v) for r in rows for v in r), self.bandwidth)
+        self.rows.extend(rows)
+
+    def batch_update(self, data, value_input_option="RAW", **kwargs):
+        # Hanya range satu sel: "C5"
+        _wait(self.latency)
+        for item in data:
+            m = re.fullmatch(r"([A-Z]+)(\d+)", item["range"])
+            col, row = _col_index(m[1]), int(m[2]) - 1
+            self._check_grid(col)
+            value = "" if item["values"][0][0] is None else str(item["values"][0][0])
+            self.stats["bytes_written"] += len(value)
+            while len(self.rows) <= row:
+                self.rows.append([])
+            cells = self.rows[row]
+            cells.extend([""] * (col + 1 - len(cells)))
+            cells[col] = value
+
+    def update(self, range_name=None, values=None, **kwargs):
+        # Hanya mendukung penulisan header di A1
+        if range_name != "A1" or len(values) != 1:
+            raise NotImplementedError(range_name)
+        header = [str(v) for v in values[0]]
+        self._check_grid(len(header) - 1)
+        self.stats["bytes_written"] += sum(len(v) for v in header)
+        if self.rows:
+            self.rows[0] = header
+        else:
+            self.rows.append(header)
+
+    def _check_grid(self, col):
+        if col >= self.col_count:
+            raise ValueError(f"{self.title}: kolom {col + 1} exceeds grid limits ({self.col_count} kolom)")
+
+
+def _wait(latency, nbytes=0, bandwidth=None):
+    delay = latency + (nbytes / bandwidth if bandwidth else 0)
+    if delay:
+        time.sleep(delay)
+
+
+def _col_index(letters):
+    i = 0
+    for ch in letters:
+        i = i * 26 + ord(ch) - 64
+    return i - 1
+
+
+class FakeSpreadsheet:
+    def __init__(self, stats, latency=0.0, bandwidth=None):
+        self.stats = stats
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.sheets = {}
+
+    def worksheet(self, title):
+        if title not in self.sheets:
+            raise WorksheetNotFound(title)
+        return self.sheets[title]
+
+    def worksheets(self):
+        return list(self.sheets.values())
+
+    def add_worksheet(self, title, rows=1000, cols=26, **kwargs):
+        self.sheets[title] = FakeWorksheet(title, self.stats, self.latency, self.bandwidth, cols)
+        return self.sheets[title]
+
+
+class FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def _open_spreadsheet(self, **kwargs):
+        return self.spreadsheet
+
+
+class FakeGSheetsConnection:
+    def __init__(self, latency=0.0, bandwidth=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.stats = {"bytes_read": 0, "bytes_written": 0}
+        self.spreadsheet = FakeSpreadsheet(self.stats, latency, bandwidth)
+        self.client = FakeClient(self.spreadsheet)
+
+    def read(self, worksheet=None, ttl=None, **kwargs):
+        ws = self.spreadsheet.worksheet(worksheet)
+        if not ws.rows:
+            _wait(self.latency)
+            return pd.DataFrame()
+        width = len(ws.rows[0])
+        rows = [r + [""] * (width - len(r)) for r in ws.rows[1:]]
+        payload = pd.DataFrame(rows, columns=ws.rows[0]).to_csv(index=False)
+        self.stats["bytes_read"] += len(payload)
+        _wait(self.latency, len(payload), self.bandwidth)
+        return pd.read_csv(io.StringIO(payload), dtype=str, keep_default_na=False)
+
+    def update(self, worksheet=None, data=None, **kwargs):
+        payload = data.to_csv(index=False)
+        self.stats["bytes_written"] += len(payload)
+        _wait(self.latency, len(payload), self.bandwidth)
+        df = pd.read_csv(io.StringIO(payload), dtype=str, keep_default_na=False)
+        if worksheet not in self.spreadsheet.sheets:
+            self.spreadsheet.add_worksheet(worksheet)
+        ws = self.spreadsheet.worksheet(worksheet)
+        # set_with_dataframe menyesuaikan ukuran grid dengan frame
+        ws.col_count = max(len(df.columns), 1)
+        ws.rows = [list(df.columns)] + df.values.tolist()
+
+    def seed(self, worksheet, data):
+        # Isi awal tanpa dihitung sebagai transfer
+        ws = self.spreadsheet.add_worksheet(worksheet, cols=max(len(data.columns), 1))
+        ws.rows = [list(data.columns)] + data.astype(str).values.tolist()
+
+    def set_network(self, latency=0.0, bandwidth=None):
+        # Mis. isi data tanpa jeda dulu, lalu aktifkan jeda untuk pengukuran
+        for obj in [self, self.spreadsheet, *self.spreadsheet.sheets.values()]:
+            obj.latency, obj.bandwidth = latency, bandwidth
+
+    def reset_stats(self):
+        self.stats.update(bytes_read=0, bytes_written=0)
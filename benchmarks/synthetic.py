@@ -0,0 +1,111 @@
+"""Data sintetis bertahun-tahun untuk benchmark dashboard.
+
+Log mengikuti schedule.json (semua tugas terjadwal per hari, sebagian tidak
+dikerjakan / terlambat), laporan berisi temuan pelaksana & komplain
+pengawas. Foto dibuat dari frame kamera tiruan 640x480 yang di-encode
+lewat imaging.make_variants, jadi ukurannya sama dengan foto asli:
+`photos="inline"` menaruh base64 di sel seperti OK-V1..V5, `photos="blob"`
+menyimpan ke BlobStore dan menaruh ref + thumbnail seperti app.py sekarang.
+"""
+import base64
+import io
+import os
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from imaging import make_variants  # noqa: E402
+from schedule import load_schedule  # noqa: E402
+from storage import row_id  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AREAS = ["Kelas X-1", "Kelas XI-2", "Lab Biologi", "Toilet Guru", "Perpus", "Halaman Depan", "Kantin", "UKS"]
+
+
+def camera_frames(n=8, seed=0):
+    # Gambar halus + noise sensor: ukuran JPEG-nya mendekati foto kamera HP
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(n):
+        base = Image.fromarray(rng.integers(0, 255, (30, 40, 3), dtype=np.uint8)).resize((640, 480), Image.BICUBIC)
+        noise = rng.normal(0, 12, (480, 640, 3))
+        pixels = np.clip(np.asarray(base, dtype=np.float64) + noise, 0, 255).astype(np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(pixels).save(buf, format="JPEG", quality=90)
+        frames.append(buf.getvalue())
+    return frames
+
+
+def photo_pool(photos, blob_store=None, fmt="jpeg", n=8):
+    # Daftar dict {"": nilai sel foto, "thumb": nilai sel thumbnail}
+    pool = []
+    for raw in camera_frames(n):
+        detail, thumb = make_variants(io.BytesIO(raw), fmt)
+        if photos == "inline":
+            pool.append({"": base64.b64encode(detail).decode(), "thumb": ""})
+        else:
+            ref, thumb_cell = blob_store.put_image(detail, thumb)
+            pool.append({"": ref, "thumb": thumb_cell})
+    return pool
+
+
+def generate_logs(years, end=None, photos="inline", blob_store=None, done_rate=0.9, seed=0):
+    end = end or date.today()
+    start = end.replace(year=end.year - years) + timedelta(days=1)
+    schedule = load_schedule(os.path.join(ROOT, "schedule.json"))
+    tasks = schedule.tasks_between(start, end)
+    rng = np.random.default_rng(seed)
+    tasks = tasks[rng.random(len(tasks)) < done_rate].reset_index(drop=True)
+    # Sebagian kecil dikerjakan 1-3 hari setelah jadwal
+    late = rng.random(len(tasks)) < 0.05
+    tanggal = pd.to_datetime(tasks["tanggal"]) + pd.to_timedelta(np.where(late, rng.integers(1, 4, len(tasks)), 0), unit="D")
+    tanggal = tanggal.where(tanggal.dt.date <= end, pd.Timestamp(end)).dt.strftime("%Y-%m-%d")
+    pool = photo_pool(photos, blob_store)
+    pick = rng.integers(0, len(pool), (len(tasks), 2))
+    logs = pd.DataFrame({
+        "id": [row_id(t, g) for t, g in zip(tanggal, tasks["tugas"])],
+        "tanggal": tanggal,
+        "tugas": tasks["tugas"],
+        "status": "Selesai",
+        "keterangan": np.where(rng.random(len(tasks)) < 0.1, "Sabun habis", ""),
+        "sebelum": [pool[i][""] for i in pick[:, 0]],
+        "sesudah": [pool[i][""] for i in pick[:, 1]],
+    })
+    if photos != "inline":
+        logs["sebelum_thumb"] = [pool[i]["thumb"] for i in pick[:, 0]]
+        logs["sesudah_thumb"] = [pool[i]["thumb"] for i in pick[:, 1]]
+    # Urutan baris = urutan submit
+    return logs.drop_duplicates("id").sort_values("tanggal", kind="stable", ignore_index=True)
+
+
+def generate_reports(years, end=None, photos="inline", blob_store=None, per_week=3, seed=1):
+    end = end or date.today()
+    days = pd.date_range(end.replace(year=end.year - years) + timedelta(days=1), end, freq="D")
+    rng = np.random.default_rng(seed)
+    n = int(len(days) / 7 * per_week)
+    tanggal = np.sort(rng.choice(days.strftime("%Y-%m-%d"), n))
+    tipe = np.where(rng.random(n) < 0.6, "Temuan Pelaksana", "Komplain Pengawas")
+    area = rng.choice(AREAS, n)
+    masalah = [f"Masalah #{i}" for i in range(n)]
+    pool = photo_pool(photos, blob_store)
+    pick = rng.integers(0, len(pool), n)
+    temuan = tipe == "Temuan Pelaksana"
+    reports = pd.DataFrame({
+        "id": [row_id(*parts) for parts in zip(tanggal, area, masalah, tipe)],
+        "tanggal": tanggal, "area": area, "masalah": masalah,
+        "foto": [pool[i][""] if t else "" for i, t in zip(pick, temuan)],
+        "tipe": tipe,
+    })
+    if photos != "inline":
+        reports["foto_thumb"] = [pool[i]["thumb"] if t else "" for i, t in zip(pick, temuan)]
+    return reports
+
+
+def legacy_frame(data):
+    # Kolom seperti sheet OK-V1..V5: tanpa id / thumbnail
+    return data.drop(columns=[c for c in data.columns if c == "id" or c.endswith("_thumb")])
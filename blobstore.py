@@ -0,0 +1,90 @@
+import base64
+import binascii
+import hashlib
+import io
+import os
+import tempfile
+
+from imaging import make_variants
+
+REF_PREFIX = "sha256:"
+
+# Kolom foto per sheet; tiap kolom punya pasangan "<kolom>_thumb"
+IMAGE_COLUMNS = {
+    "cleaning_logs": ["sebelum", "sesudah"],
+    "cleaning_reports": ["foto"],
+}
+
+
+# --- PENYIMPANAN FOTO (CONTENT-ADDRESSED) ---
+# Foto disimpan sebagai file di disk dengan nama = SHA-256 isinya,
+# baris sheet hanya menyimpan referensi "sha256:<hex>".
+class BlobStore:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def put(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return REF_PREFIX + digest
+
+    def get(self, ref):
+        with open(self.path(ref[len(REF_PREFIX):]), "rb") as f:
+            return f.read()
+
+    def put_image(self, detail, thumb):
+        # Simpan varian dari imaging.make_variants, kembalikan (ref_foto, ref_thumbnail)
+        return self.put(detail), self.put(thumb)
+
+    def load(self, cell):
+        # Isi sel bisa referensi blob atau base64 lama (sebelum migrasi)
+        if not isinstance(cell, str) or not cell:
+            return None
+        if is_ref(cell):
+            try:
+                return self.get(cell)
+            except FileNotFoundError:
+                return None
+        try:
+            return base64.b64decode(cell, validate=True)
+        except (binascii.Error, ValueError):
+            return None
+
+
+def is_ref(cell):
+    return isinstance(cell, str) and cell.startswith(REF_PREFIX)
+
+
+def migrate_inline_images(storage, store, sheet_name, fmt="JPEG"):
+    # Pindahkan sel base64 lama ke blob store, lalu tulis ulang sheet sekali
+    df = storage.read(sheet_name)
+    moved = 0
+    for col in IMAGE_COLUMNS.get(sheet_name, []):
+        if col not in df.columns:
+            continue
+        thumb_col = f"{col}_thumb"
+        if thumb_col not in df.columns:
+            df[thumb_col] = ""
+        df[col] = df[col].astype(object)
+        df[thumb_col] = df[thumb_col].astype(object)
+        for i, cell in df[col].items():
+            if not isinstance(cell, str) or not cell or is_ref(cell):
+                continue
+            data = store.load(cell)
+            if data is None:
+                continue
+            df.at[i, col], df.at[i, thumb_col] = store.put_image(*make_variants(io.BytesIO(data), fmt))
+            moved += 1
+    if moved:
+        storage.update(sheet_name, df)
+    return moved
@@ -0,0 +1,40 @@
+import threading
+from collections import deque
+
+
+# --- UMPAN PERUBAHAN (PUB/SUB DALAM PROSES) ---
+# Setiap batch yang berhasil ditulis ke storage oleh antrean unggah (satu-
+# satunya jalur tulis aplikasi, lihat UploadQueue.flush) diterbitkan ke sini
+# dengan nomor urut. Dashboard yang terbuka menyimpan kursor (nomor urut
+# terakhir yang sudah diterapkan) dan hanya mengambil baris setelahnya, jadi
+# tampilan diperbarui tanpa membaca ulang sheet.
+# Hanya menyimpan max_events kejadian terakhir; kursor yang tertinggal lebih
+# jauh dari itu mendapat None dan harus memuat ulang dari storage.
+class ChangeFeed:
+    def __init__(self, max_events=1000):
+        self._events = deque(maxlen=max_events)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def publish(self, sheet_name, data):
+        # data: DataFrame baris yang baru ditulis (dengan kolom "id")
+        rows = data.to_dict("records")
+        if not rows:
+            return
+        with self._lock:
+            self._seq += 1
+            self._events.append((self._seq, sheet_name, rows))
+
+    def cursor(self):
+        # Ambil SEBELUM memuat dari storage supaya tulisan di antaranya tidak terlewat
+        return self._seq
+
+    def since(self, cursor, sheet_name):
+        # (kursor baru, baris sheet_name setelah cursor) atau (kursor baru, None)
+        # jika sebagian kejadian sudah terbuang dari buffer
+        with self._lock:
+            seq = self._seq
+            if self._events and self._events[0][0] > cursor + 1:
+                return seq, None
+            rows = [row for s, sheet, batch in self._events if s > cursor and sheet == sheet_name for row in batch]
+        return seq, rows
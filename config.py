@@ -0,0 +1,77 @@
+import os
+
+import streamlit as st
+
+
+# --- KONFIGURASI PENYIMPANAN ---
+# Dibaca dari [storage] di secrets.toml, bisa ditimpa env STORAGE_BACKEND,
+# STORAGE_PATH, BLOB_DIR, SPOOL_DIR, BUNDLE_DIR, CACHE_TTL, CACHE_ENTRIES,
+# IMAGE_FORMAT, SCHEDULE_FILE dan SITES_FILE
+def get_storage_config():
+    try:
+        config = dict(st.secrets.get("storage", {}))
+    except FileNotFoundError:
+        config = {}
+    if os.environ.get("STORAGE_BACKEND"):
+        config["backend"] = os.environ["STORAGE_BACKEND"]
+    if os.environ.get("STORAGE_PATH"):
+        config["path"] = os.environ["STORAGE_PATH"]
+    if os.environ.get("BLOB_DIR"):
+        config["blob_dir"] = os.environ["BLOB_DIR"]
+    if os.environ.get("SPOOL_DIR"):
+        config["spool_dir"] = os.environ["SPOOL_DIR"]
+    if os.environ.get("BUNDLE_DIR"):
+        config["bundle_dir"] = os.environ["BUNDLE_DIR"]
+    if os.environ.get("CACHE_TTL"):
+        config["cache_ttl"] = os.environ["CACHE_TTL"]
+    if os.environ.get("CACHE_ENTRIES"):
+        config["cache_entries"] = os.environ["CACHE_ENTRIES"]
+    if os.environ.get("IMAGE_FORMAT"):
+        config["image_format"] = os.environ["IMAGE_FORMAT"]
+    if os.environ.get("SCHEDULE_FILE"):
+        config["schedule_file"] = os.environ["SCHEDULE_FILE"]
+    if os.environ.get("SITES_FILE"):
+        config["sites_file"] = os.environ["SITES_FILE"]
+    config.setdefault("blob_dir", "data/blobs")
+    config.setdefault("spool_dir", "data/spool")
+    config.setdefault("bundle_dir", "data/bundles")
+    config.setdefault("schedule_file", "schedule.json")
+    config.setdefault("sites_file", "sites.json")
+    # "jpeg" bawaan, "webp" untuk file foto yang lebih kecil
+    config.setdefault("image_format", "jpeg")
+    return config
+
+
+# --- KONFIGURASI TAMPILAN ---
+# Dibaca dari [ui] di secrets.toml, bisa ditimpa env PAGE_SIZE dan
+# LIVE_INTERVAL (detik antar cek umpan perubahan di dashboard Pengawas)
+def get_ui_config():
+    try:
+        config = dict(st.secrets.get("ui", {}))
+    except FileNotFoundError:
+        config = {}
+    if os.environ.get("PAGE_SIZE"):
+        config["page_size"] = os.environ["PAGE_SIZE"]
+    if os.environ.get("LIVE_INTERVAL"):
+        config["live_interval"] = os.environ["LIVE_INTERVAL"]
+    config["page_size"] = max(int(config.get("page_size", 10)), 1)
+    config["live_interval"] = max(float(config.get("live_interval", 5)), 1.0)
+    return config
+
+
+# --- KONFIGURASI DIAGNOSTIK ---
+# Dibaca dari [metrics] di secrets.toml, bisa ditimpa env METRICS_ENABLED dan
+# METRICS_FILE (file teks format Prometheus)
+def get_metrics_config():
+    try:
+        config = dict(st.secrets.get("metrics", {}))
+    except FileNotFoundError:
+        config = {}
+    if os.environ.get("METRICS_ENABLED"):
+        config["enabled"] = os.environ["METRICS_ENABLED"]
+    if os.environ.get("METRICS_FILE"):
+        config["textfile"] = os.environ["METRICS_FILE"]
+    enabled = config.get("enabled", False)
+    config["enabled"] = enabled if isinstance(enabled, bool) else str(enabled).lower() in ("1", "true", "yes")
+    config.setdefault("textfile", "")
+    return config
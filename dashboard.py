@@ -0,0 +1,53 @@
+from taskindex import DONE, PENDING, TaskIndex
+
+
+# --- DATA DASHBOARD BERSAMA ---
+# Semua turunan yang dipakai tab Pelaksana maupun Pengawas (tugas hari ini,
+# status per tugas, progress, daftar komplain/temuan) dihitung sekali di
+# sini; tab hanya menampilkan. Objeknya dimemo per (tanggal, revisi data):
+# cache storage mengembalikan frame yang sama selama isi sheet tidak
+# berubah dan jadwal dimemo per tanggal, jadi identitas ketiga objek
+# masukan sudah menjadi penanda revisi.
+class DashboardData:
+    def __init__(self, tanggal, tasks, logs, reps):
+        self.tanggal = tanggal
+        self.tasks = tasks
+        self.task_list = [item for items in tasks.values() for item in items]
+        self.total = len(self.task_list)
+        # Milik sesi ini (lihat dashboard_data): submit menambah PENDING ke
+        # sini tanpa mengubah frame cache yang dipakai bersama semua sesi
+        self.index = TaskIndex.from_logs(logs)
+        # Baris hari ini per status untuk riwayat Pelaksana
+        status = logs["status"] if "status" in logs else None
+        self.done_logs = logs[status != PENDING] if status is not None else logs
+        self.pending_logs = logs[status == PENDING] if status is not None else logs.iloc[:0]
+        # Terbaru (termasuk jurnal) di atas
+        tipe = reps["tipe"] if "tipe" in reps else None
+        self.komplain = reps[tipe == "Komplain Pengawas"].iloc[::-1] if tipe is not None else reps
+        self.temuan = reps[tipe == "Temuan Pelaksana"].iloc[::-1] if tipe is not None else reps
+
+    @property
+    def done_count(self):
+        return self.index.done_count(self.tanggal)
+
+    @property
+    def progress(self):
+        return self.done_count / self.total if self.total > 0 else 0
+
+    def status(self, tugas):
+        return self.index.status(self.tanggal, tugas)
+
+    def is_done(self, tugas):
+        return self.status(tugas) == DONE
+
+
+def dashboard_data(memo, tanggal, tasks, logs, reps):
+    # memo: dict per sesi (st.session_state). Tidak disimpan di attrs frame
+    # karena pandas menyalin attrs ke setiap frame turunan
+    key = (tanggal, id(tasks), id(logs), id(reps))
+    cached = memo.get("dashboard")
+    if cached is None or cached[0] != key:
+        # Objek masukan ikut disimpan supaya id-nya tidak dipakai ulang objek lain
+        cached = (key, (tasks, logs, reps), DashboardData(tanggal, tasks, logs, reps))
+        memo["dashboard"] = cached
+    return cached[2]
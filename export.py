@@ -0,0 +1,63 @@
+import xlsxwriter
+
+# Label -> ekstensi file; Parquet hanya muncul kalau pyarrow terpasang
+FORMATS = {"Excel": "xlsx", "CSV": "csv", "Parquet": "parquet"}
+
+
+def available_formats():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return [f for f in FORMATS if f != "Parquet"]
+    return list(FORMATS)
+
+
+# --- EXPORT BERTAHAP ---
+# Baris dibaca dari storage per potongan (iter_chunks) dan langsung ditulis
+# ke file, sehingga memori hanya menampung satu potongan, bukan seluruh
+# histori plus salinannya. Excel memakai mode constant_memory xlsxwriter.
+def export_rows(chunks, columns, fmt, path):
+    # Tulis potongan DataFrame ke `path`, kembalikan jumlah baris
+    writer = {"Excel": _write_xlsx, "CSV": _write_csv, "Parquet": _write_parquet}[fmt]
+    return writer((_clean(c, columns) for c in chunks), columns, path)
+
+
+def _clean(chunk, columns):
+    chunk = chunk.reindex(columns=columns).astype(object)
+    return chunk.where(chunk.notna(), "")
+
+
+def _write_xlsx(chunks, columns, path):
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    sheet = workbook.add_worksheet("Laporan")
+    sheet.write_row(0, 0, columns)
+    row = 0
+    for chunk in chunks:
+        for values in chunk.itertuples(index=False, name=None):
+            row += 1
+            sheet.write_row(row, 0, values)
+    workbook.close()
+    return row
+
+
+def _write_csv(chunks, columns, path):
+    rows = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(columns) + "\n")
+        for chunk in chunks:
+            chunk.to_csv(f, header=False, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet(chunks, columns, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(c, pa.string()) for c in columns])
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk.astype(str), schema=schema, preserve_index=False))
+            rows += len(chunk)
+    return rows
@@ -0,0 +1,53 @@
+import io
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Ukuran varian foto: detail untuk tampilan penuh, thumb untuk daftar
+DETAIL_SIZE = (500, 500)
+THUMB_SIZE = (64, 64)
+QUALITY = {"JPEG": 50, "WEBP": 50}
+THUMB_QUALITY = {"JPEG": 60, "WEBP": 60}
+# dHash 8x8 = 64 bit
+HASH_SIZE = 8
+
+
+# --- PIPELINE FOTO ---
+# Satu kali decode menghasilkan dua varian. Image.draft() membuat decoder
+# JPEG langsung mengecilkan skala (1/2, 1/4, 1/8) sehingga foto kamera
+# besar tidak pernah didecode penuh. EXIF dibuang setelah orientasinya
+# diterapkan.
+def make_variants(source, fmt="JPEG"):
+    detail, thumb, _ = make_hashed_variants(source, fmt)
+    return detail, thumb
+
+
+def make_hashed_variants(source, fmt="JPEG"):
+    # Seperti make_variants, plus dhash() dari gambar detail yang sama
+    fmt = fmt.upper()
+    if fmt not in QUALITY:
+        raise ValueError(f"Format foto tidak dikenal: {fmt}")
+    img = Image.open(source)
+    img.draft("RGB", DETAIL_SIZE)
+    img = ImageOps.exif_transpose(img).convert("RGB")
+    img.info.clear()
+    img.thumbnail(DETAIL_SIZE)
+    detail = _encode(img, fmt, QUALITY[fmt])
+    phash = dhash(img)
+    img.thumbnail(THUMB_SIZE)
+    return detail, _encode(img, fmt, THUMB_QUALITY[fmt]), phash
+
+
+def dhash(img):
+    # Hash perseptual 64-bit: arah selisih kecerahan piksel bertetangga pada
+    # versi abu-abu 9x8. Tahan terhadap encode ulang, skala dan perubahan
+    # kecerahan ringan; foto yang sama hanya berbeda beberapa bit
+    px = np.asarray(img.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS), dtype=np.int16)
+    bits = (px[:, 1:] > px[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _encode(img, fmt, quality):
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, quality=quality)
+    return buf.getvalue()
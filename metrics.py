@@ -0,0 +1,199 @@
+import math
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+# Batas atas bucket histogram latensi (detik), gaya Prometheus
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+
+# --- INSTRUMENTASI WAKTU ---
+# timer(call, **label) mengukur satu panggilan (load_data, tulis antrean
+# unggah, blok render tab, ...) ke histogram latensi + total baris & byte
+# per kombinasi label. Saat nonaktif timer() mengembalikan objek kosong yang sama terus,
+# jadi biayanya hanya satu pemanggilan fungsi.
+class Metrics:
+    def __init__(self, enabled=False, textfile=None, write_interval=5.0, prefix="kebersihan"):
+        self.enabled = enabled
+        self.textfile = textfile
+        self.write_interval = write_interval
+        self.prefix = prefix
+        self._series = {}
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+
+    def timer(self, call, **labels):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, call, labels)
+
+    def observe(self, call, seconds, rows=0, nbytes=0, **labels):
+        key = (call, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            series.add(seconds, rows, nbytes)
+
+    def snapshot(self):
+        # Satu baris per (call, label) untuk panel Diagnostik
+        with self._lock:
+            items = [(call, labels, s.copy()) for (call, labels), s in self._series.items()]
+        rows = [{
+            "call": call,
+            "label": ", ".join(f"{k}={v}" for k, v in labels),
+            "jumlah": s.count,
+            "rata_ms": round(s.total / s.count * 1000, 1),
+            "p95_ms": round(s.quantile(0.95) * 1000, 1),
+            "maks_ms": round(s.max * 1000, 1),
+            "baris": s.rows,
+            "byte": s.nbytes,
+        } for call, labels, s in items]
+        columns = ["call", "label", "jumlah", "rata_ms", "p95_ms", "maks_ms", "baris", "byte"]
+        return pd.DataFrame(rows, columns=columns).sort_values("rata_ms", ascending=False, ignore_index=True)
+
+    def to_prometheus(self):
+        with self._lock:
+            items = [(call, labels, s.copy()) for (call, labels), s in sorted(self._series.items())]
+        name = f"{self.prefix}_call"
+        lines = [
+            f"# HELP {name}_seconds Latensi panggilan storage, gambar, jadwal dan render tab.",
+            f"# TYPE {name}_seconds histogram",
+        ]
+        for call, labels, s in items:
+            cumulative = 0
+            for bound, n in zip(BUCKETS, s.buckets):
+                cumulative += n
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                lines.append(f"{name}_seconds_bucket{_labels(call, labels, le=le)} {cumulative}")
+            lines.append(f"{name}_seconds_sum{_labels(call, labels)} {s.total:.6f}")
+            lines.append(f"{name}_seconds_count{_labels(call, labels)} {s.count}")
+        for metric, attr, help_text in (("rows", "rows", "Jumlah baris yang dibaca/ditulis."),
+                                        ("bytes", "nbytes", "Jumlah byte yang dibaca dari storage / foto yang diproses.")):
+            lines.append(f"# HELP {name}_{metric}_total {help_text}")
+            lines.append(f"# TYPE {name}_{metric}_total counter")
+            for call, labels, s in items:
+                lines.append(f"{name}_{metric}_total{_labels(call, labels)} {getattr(s, attr)}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, force=False):
+        # Untuk textfile collector node_exporter; ditulis atomik & dibatasi
+        # paling sering tiap write_interval detik
+        if not self.enabled or not self.textfile:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_write < self.write_interval:
+            return
+        self._last_write = now
+        directory = os.path.dirname(os.path.abspath(self.textfile))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".prom.tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, self.textfile)
+
+
+class _Series:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.nbytes = 0
+
+    def add(self, seconds, rows, nbytes):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.rows += rows
+        self.nbytes += nbytes
+
+    def quantile(self, q):
+        # Perkiraan dari batas atas bucket, dibatasi nilai maksimum terukur
+        target = q * self.count
+        cumulative = 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            cumulative += n
+            if cumulative >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def copy(self):
+        other = _Series()
+        other.__dict__.update(self.__dict__, buckets=list(self.buckets))
+        return other
+
+
+class _Timer:
+    def __init__(self, metrics, call, labels):
+        self.metrics = metrics
+        self.call = call
+        self.labels = labels
+        self.rows = 0
+        self.nbytes = 0
+
+    def measure(self, data):
+        # DataFrame -> jumlah baris; bytes/tuple bytes -> panjang. Ukuran
+        # memori frame tidak dihitung sebagai byte: byte baca storage dicatat
+        # lewat add_bytes dari penghitung backend (storage.bytes_read)
+        if isinstance(data, pd.DataFrame):
+            self.rows += len(data)
+        elif isinstance(data, (tuple, list)):
+            for part in data:
+                self.measure(part)
+        elif isinstance(data, (bytes, bytearray)):
+            self.nbytes += len(data)
+        return data
+
+    def add_bytes(self, nbytes):
+        self.nbytes += nbytes
+
+    def label(self, **labels):
+        # Label yang baru diketahui setelah panggilan berjalan (mis. sumber baca)
+        self.labels.update(labels)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.call, time.perf_counter() - self._start,
+                             self.rows, self.nbytes, **self.labels)
+        return False
+
+
+class _NullTimer:
+    def measure(self, data):
+        return data
+
+    def add_bytes(self, nbytes):
+        pass
+
+    def label(self, **labels):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def _labels(call, labels, **extra):
+    pairs = [("call", call), *labels, *extra.items()]
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -0,0 +1,26 @@
+"""Pindahkan histori lama di sheet cleaning_logs ke partisi per bulan.
+
+Jalankan sekali dari root repo (memakai konfigurasi yang sama dengan app.py):
+    python migrate_partitions.py
+"""
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from config import get_storage_config
+from storage import PARTITIONS, create_storage
+
+
+def main():
+    # Tanpa TypedStorage: tanggal yang bukan YYYY-MM-DD ditulis ulang apa adanya
+    config = {**get_storage_config(), "typed": False, "cache_ttl": 0}
+    storage = create_storage(config, lambda: st.connection("gsheets", type=GSheetsConnection))
+    for sheet_name in PARTITIONS:
+        # read() tanpa rentang ikut membaca sheet asli, update() menulis ulang per bulan
+        data = storage.read(sheet_name)
+        storage.update(sheet_name, data)
+        months = sorted({str(t)[:7] for t in data[PARTITIONS[sheet_name]]}) if not data.empty else []
+        print(f"{sheet_name}: {len(data)} baris dibagi ke {len(months)} partisi bulan")
+
+
+if __name__ == "__main__":
+    main()
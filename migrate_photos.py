@@ -0,0 +1,25 @@
+"""Pindahkan foto base64 lama dari sel sheet ke blob store.
+
+Jalankan dari root repo (memakai konfigurasi yang sama dengan app.py):
+    python migrate_photos.py
+"""
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+from blobstore import IMAGE_COLUMNS, BlobStore, migrate_inline_images
+from config import get_storage_config
+from storage import create_storage
+
+
+def main():
+    config = get_storage_config()
+    # Tanpa TypedStorage: tanggal yang bukan YYYY-MM-DD ditulis ulang apa adanya
+    storage = create_storage({**config, "typed": False, "cache_ttl": 0}, lambda: st.connection("gsheets", type=GSheetsConnection))
+    store = BlobStore(config["blob_dir"])
+    for sheet_name in IMAGE_COLUMNS:
+        moved = migrate_inline_images(storage, store, sheet_name, config["image_format"])
+        print(f"{sheet_name}: {moved} foto dipindahkan ke {store.root}")
+
+
+if __name__ == "__main__":
+    main()
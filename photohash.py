@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+# Jarak Hamming (bit dari 64) antar dHash:
+#   <= IDENTICAL_BITS  kemungkinan foto yang sama (encode ulang/kompresi)
+#   <= SIMILAR_BITS    hampir sama
+# Keduanya hanya penanda untuk Pengawas: foto baru selalu disimpan, karena
+# foto asli dari sudut yang sama (sebelum/sesudah) juga bisa sedekat ini.
+# Isi yang persis sama sudah tersimpan sekali lewat alamat SHA-256 BlobStore.
+IDENTICAL_BITS = 2
+SIMILAR_BITS = 6
+
+
+# --- INDEX HASH FOTO TERBARU ---
+# Menyimpan dHash (imaging.make_hashed_variants) max_entries foto terakhir
+# satu sekolah beserta referensi blob-nya. register() menyimpan foto baru
+# lalu mencari foto terdekat dari pemilik lain; foto identik/mirip mendapat
+# keterangan untuk Pengawas, mis. foto "sesudah" yang sama dengan "sebelum"
+# atau foto kemarin yang dipakai ulang. Isi index ditambahkan ke file JSONL dan dibaca kembali saat start.
+class PhotoHashIndex:
+    def __init__(self, path, max_entries=5000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # pemilik -> entri, urut dari yang terlama
+        self._entries = {}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lines = 0
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        self._add(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue
+        self._rebuild()
+        if lines > 2 * max_entries:
+            self._compact()
+
+    def register(self, phash, owner, label, store):
+        # owner: pemilik foto (mis. "<id baris>/<kolom>"), kirim ulang pemilik
+        # yang sama tidak dianggap duplikat. store() -> (ref, ref_thumbnail)
+        # selalu dipanggil. Hasil: (ref, ref_thumbnail, keterangan)
+        ref, thumb = store()
+        with self._lock:
+            match = self._nearest(phash, owner)
+            entry = {"hash": phash, "ref": ref, "thumb": thumb, "owner": owner, "label": label}
+            self._add(entry)
+            self._rebuild()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        return ref, thumb, _describe(match)
+
+    def _nearest(self, phash, owner):
+        # (jarak, entri) terdekat dari pemilik lain dalam SIMILAR_BITS, atau None
+        if not len(self._hashes):
+            return None
+        diff = np.bitwise_xor(self._hashes, np.uint64(phash))
+        distance = np.unpackbits(diff.view(np.uint8)).reshape(len(diff), 64).sum(axis=1)
+        for i in np.argsort(distance, kind="stable"):
+            if distance[i] > SIMILAR_BITS:
+                return None
+            if owner is None or self._list[i]["owner"] != owner:
+                return int(distance[i]), self._list[i]
+        return None
+
+    def _add(self, entry):
+        # Pemilik yang sama (kirim ulang) menggantikan entri lamanya
+        key = entry["owner"] if entry["owner"] is not None else object()
+        self._entries.pop(key, None)
+        self._entries[key] = {k: entry[k] for k in ("hash", "ref", "thumb", "owner", "label")}
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def _rebuild(self):
+        self._list = list(self._entries.values())
+        self._hashes = np.array([e["hash"] for e in self._list], dtype=np.uint64)
+
+    def _compact(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in self._list:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp, self.path)
+
+
+def _describe(match):
+    if match is None:
+        return ""
+    distance, entry = match
+    if distance <= IDENTICAL_BITS:
+        return f"hampir identik ({distance}/64 bit berbeda) dengan foto {entry['label']}"
+    return f"mirip ({distance}/64 bit berbeda) dengan foto {entry['label']}"
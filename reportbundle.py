@@ -0,0 +1,164 @@
+import base64
+import binascii
+import csv
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from blobstore import BlobStore, is_ref
+
+# Kolom log yang masuk manifest; kolom foto berisi referensi blob (atau base64 lama)
+BUNDLE_COLUMNS = ["tanggal", "tugas", "keterangan", "status", "sebelum", "sesudah"]
+PHOTO_COLUMNS = ["sebelum", "sesudah"]
+KEEP_BUNDLES = 10
+
+
+# --- LAPORAN LENGKAP (ZIP DENGAN FOTO) ---
+# Script Streamlit hanya menulis manifest berisi metadata + referensi foto
+# (dialirkan dari storage.iter_chunks). ZIP dibangun di process pool
+# terpisah: foto disalin file demi file dari blob store ke arsip, progres
+# ditulis ke file kecil yang dibaca dashboard. Hasil dicache per rentang
+# tanggal + isi manifest, jadi permintaan ulang tanpa data baru langsung siap.
+class BundleJobs:
+    def __init__(self, out_dir, blob_dir, workers=1):
+        self.out_dir = out_dir
+        self.blob_dir = blob_dir
+        os.makedirs(out_dir, exist_ok=True)
+        self.workers = workers
+        self._pool = self._new_pool()
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, chunks, start, end):
+        # Tulis manifest, kembalikan key pekerjaan (dipakai untuk status())
+        fd, tmp = tempfile.mkstemp(dir=self.out_dir, suffix=".tmp")
+        digest = hashlib.sha256()
+        total = 0
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(",".join(BUNDLE_COLUMNS) + "\n")
+            for chunk in chunks:
+                text = chunk.reindex(columns=BUNDLE_COLUMNS).to_csv(header=False, index=False)
+                digest.update(text.encode())
+                f.write(text)
+                total += len(chunk)
+        key = f"{start}_{end}_{digest.hexdigest()[:12]}"
+        manifest = self._path(key, "csv")
+        os.replace(tmp, manifest)
+        with self._lock:
+            running = key in self._futures and not self._futures[key].done()
+            if not running and not os.path.exists(self._path(key, "zip")):
+                args = (manifest, self.blob_dir, self._path(key, "zip"), self._path(key, "progress"), total)
+                try:
+                    self._futures[key] = self._pool.submit(build_zip, *args)
+                except BrokenProcessPool:
+                    # Proses anak mati (mis. kehabisan memori); buat pool baru
+                    self._pool = self._new_pool()
+                    self._futures[key] = self._pool.submit(build_zip, *args)
+                self._prune()
+        return key
+
+    def status(self, key):
+        # ("selesai", path_zip) / ("berjalan", selesai, total) / ("gagal", pesan)
+        # / ("kedaluwarsa",) jika arsip sudah dihapus _prune atau pekerjaannya
+        # tidak dikenal proses ini (mis. setelah server restart)
+        zip_path = self._path(key, "zip")
+        if os.path.exists(zip_path):
+            return ("selesai", zip_path)
+        future = self._futures.get(key)
+        if future is not None and future.done() and future.exception() is not None:
+            return ("gagal", str(future.exception()))
+        if future is None or future.done():
+            return ("kedaluwarsa",)
+        try:
+            with open(self._path(key, "progress")) as f:
+                done, total = (int(v) for v in f.read().split())
+        except (FileNotFoundError, ValueError):
+            done, total = 0, 0
+        return ("berjalan", done, total)
+
+    def _new_pool(self):
+        # spawn: proses anak tidak mewarisi thread server Streamlit
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _path(self, key, ext):
+        return os.path.join(self.out_dir, f"{key}.{ext}")
+
+    def _prune(self):
+        # Simpan hanya KEEP_BUNDLES arsip terbaru
+        zips = sorted((os.path.join(self.out_dir, n) for n in os.listdir(self.out_dir) if n.endswith(".zip")),
+                      key=os.path.getmtime)
+        for path in zips[:-KEEP_BUNDLES]:
+            for ext in (".zip", ".csv", ".progress"):
+                try:
+                    os.remove(path[:-len(".zip")] + ext)
+                except FileNotFoundError:
+                    pass
+
+
+def build_zip(manifest, blob_dir, zip_path, progress_path, total):
+    # Dijalankan di proses pool; foto per baris, tidak pernah semuanya di memori
+    store = BlobStore(blob_dir)
+    index = io.StringIO()
+    writer = csv.writer(index)
+    writer.writerow(["tanggal", "tugas", "status", "keterangan"] + [f"file_{c}" for c in PHOTO_COLUMNS])
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(zip_path), suffix=".part")
+    os.close(fd)
+    done = 0
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for chunk in pd.read_csv(manifest, dtype=str, keep_default_na=False, chunksize=200):
+            for row in chunk.itertuples(index=False):
+                files = [_add_photo(zf, store, row, col, done) for col in PHOTO_COLUMNS]
+                writer.writerow([row.tanggal, row.tugas, row.status, row.keterangan] + files)
+                done += 1
+            _write_progress(progress_path, done, total)
+        zf.writestr("index.csv", index.getvalue())
+    os.replace(tmp, zip_path)
+    _write_progress(progress_path, done, total)
+    return zip_path
+
+
+def _add_photo(zf, store, row, col, n):
+    cell = getattr(row, col)
+    if not cell:
+        return ""
+    name = f"{row.tanggal}/{n:05d}_{_slug(row.tugas)}_{col}"
+    if is_ref(cell):
+        path = store.path(cell[len("sha256:"):])
+        if not os.path.exists(path):
+            return ""
+        with open(path, "rb") as f:
+            arcname = name + _extension(f.read(12))
+        # Foto sudah terkompresi; disimpan apa adanya tanpa deflate ulang
+        zf.write(path, arcname, compress_type=zipfile.ZIP_STORED)
+        return arcname
+    try:
+        data = base64.b64decode(cell, validate=True)
+    except (binascii.Error, ValueError):
+        return ""
+    arcname = name + _extension(data[:12])
+    zf.writestr(arcname, data, compress_type=zipfile.ZIP_STORED)
+    return arcname
+
+
+def _extension(head):
+    return ".webp" if head[:4] == b"RIFF" and head[8:12] == b"WEBP" else ".jpg"
+
+
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9]+", "-", str(text)).strip("-")[:40] or "tugas"
+
+
+def _write_progress(path, done, total):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(f"{done} {total}")
+    os.replace(tmp, path)
@@ -0,0 +1,114 @@
+import json
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+
+# --- MESIN JADWAL ---
+# Aturan jadwal dibaca dari schedule.json (lihat file tsb) dan dikompilasi
+# sekali menjadi kalender: tiap tanggal -> tuple id tugas. Kalender dibuat
+# per tahun secara vektor dengan pandas, lalu setiap pertanyaan tanggal atau
+# rentang tanggal cukup lookup.
+#
+# Kondisi "when" yang didukung (semua harus terpenuhi):
+#   week_of_month: [1..5]      minggu ke-n dalam bulan, (tanggal - 1) // 7 + 1
+#   month_cycle: [n, [1..n]]   siklus bulan (bulan - 1) % n + 1
+#   month: [1..12], weekday: [0..6] (0 = Senin), day: [1..31]
+class Schedule:
+    def __init__(self, rules):
+        self.categories = list(rules["categories"])
+        self.rules = rules["rules"]
+        # id tugas = posisi di tabel ini; (kategori, nama tugas)
+        self.tasks = []
+        self._rule_tasks = []
+        for rule in self.rules:
+            ids = []
+            for name in rule["tasks"]:
+                if (rule["category"], name) not in self.tasks:
+                    self.tasks.append((rule["category"], name))
+                ids.append(self.tasks.index((rule["category"], name)))
+            self._rule_tasks.append(ids)
+        self._calendar = {}
+        self._by_date = {}
+        self._years = set()
+        self._lock = threading.Lock()
+
+    def task_ids(self, day):
+        day = _as_date(day)
+        if day.year not in self._years:
+            self._compile(day.year)
+        return self._calendar[day]
+
+    def tasks_for(self, day):
+        # {kategori: [tugas]} dengan urutan kategori tetap, seperti get_current_tasks
+        # lama; dimemo per tanggal, jangan diubah oleh pemanggil
+        day = _as_date(day)
+        if day not in self._by_date:
+            tasks = {cat: [] for cat in self.categories}
+            for task_id in self.task_ids(day):
+                cat, name = self.tasks[task_id]
+                tasks[cat].append(name)
+            self._by_date[day] = tasks
+        return self._by_date[day]
+
+    def tasks_between(self, start, end):
+        # Semua (tanggal, kategori, tugas) dalam rentang, sekali jalan
+        days = pd.date_range(_as_date(start), _as_date(end), freq="D")
+        for year in set(days.year):
+            if year not in self._years:
+                self._compile(year)
+        ids = [self._calendar[d] for d in days.date]
+        counts = np.fromiter((len(i) for i in ids), dtype=np.int64, count=len(ids))
+        flat = np.fromiter((t for i in ids for t in i), dtype=np.int64, count=int(counts.sum()))
+        table = pd.DataFrame(self.tasks, columns=["kategori", "tugas"])
+        return pd.DataFrame({
+            "tanggal": np.repeat(days.strftime("%Y-%m-%d").to_numpy(), counts),
+            "kategori": table["kategori"].to_numpy()[flat],
+            "tugas": table["tugas"].to_numpy()[flat],
+        })
+
+    def _compile(self, year):
+        with self._lock:
+            if year in self._years:
+                return
+            days = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+            hits = np.zeros((len(self.rules), len(days)), dtype=bool)
+            for r, rule in enumerate(self.rules):
+                hits[r] = _match(rule.get("when", {}), days)
+            for i, day in enumerate(days.date):
+                self._calendar[day] = tuple(t for r in np.flatnonzero(hits[:, i]) for t in self._rule_tasks[r])
+            self._years.add(year)
+
+
+def _match(when, days):
+    mask = np.ones(len(days), dtype=bool)
+    for key, value in when.items():
+        if key == "week_of_month":
+            mask &= np.isin((days.day - 1) // 7 + 1, value)
+        elif key == "month_cycle":
+            period, values = value
+            mask &= np.isin((days.month - 1) % period + 1, values)
+        elif key == "month":
+            mask &= np.isin(days.month, value)
+        elif key == "weekday":
+            mask &= np.isin(days.weekday, value)
+        elif key == "day":
+            mask &= np.isin(days.day, value)
+        else:
+            raise ValueError(f"Kondisi jadwal tidak dikenal: {key}")
+    return mask
+
+
+def _as_date(day):
+    if isinstance(day, str):
+        return date.fromisoformat(day)
+    if isinstance(day, pd.Timestamp):
+        return day.date()
+    return day
+
+
+def load_schedule(path):
+    with open(path, encoding="utf-8") as f:
+        return Schedule(json.load(f))
@@ -0,0 +1,51 @@
+import json
+import os
+
+
+# --- DAFTAR SEKOLAH & PETUGAS ---
+# sites.json berisi sekolah (site_id), jadwal per sekolah dan pengguna per
+# sekolah (username -> password, role Pelaksana/Pengawas, nama). Setiap
+# sekolah adalah satu shard penyimpanan: spreadsheet / file SQLite / spool
+# sendiri, jadi pertumbuhan data satu sekolah tidak memperlambat sekolah
+# lain. Sekolah bawaan (default_site) memakai lokasi lama apa adanya.
+class Sites:
+    def __init__(self, spec):
+        self.default = spec["default_site"]
+        self.sites = spec["sites"]
+        if self.default not in self.sites:
+            raise ValueError(f"default_site tidak ada di daftar sekolah: {self.default}")
+
+    def ids(self):
+        return list(self.sites)
+
+    def name(self, site_id):
+        return self.sites[site_id].get("nama", site_id)
+
+    def authenticate(self, site_id, username, password):
+        # (role, nama) atau None
+        user = self.sites.get(site_id, {}).get("users", {}).get(username)
+        if user is None or user["password"] != password:
+            return None
+        return user["role"], user.get("nama", username)
+
+    def shard_config(self, config, site_id):
+        # config [storage] -> config penyimpanan untuk satu sekolah:
+        #   connection  nama st.connection GSheets ("gsheets_<site>" di secrets.toml)
+        #   path        file SQLite, bawaan <dir path>/sites/<site>.db
+        #   spool_dir   antrean unggah, bawaan <spool_dir>/<site>
+        site = self.sites[site_id]
+        shard = dict(config)
+        if site_id == self.default:
+            shard["connection"] = site.get("connection", "gsheets")
+        else:
+            shard["connection"] = site.get("connection", f"gsheets_{site_id}")
+            base = os.path.dirname(config.get("path", "data/muhamka.db"))
+            shard["path"] = site.get("path", os.path.join(base, "sites", f"{site_id}.db"))
+            shard["spool_dir"] = os.path.join(config["spool_dir"], site_id)
+        shard["schedule_file"] = site.get("schedule_file", config["schedule_file"])
+        return shard
+
+
+def load_sites(path):
+    with open(path, encoding="utf-8") as f:
+        return Sites(json.load(f))
@@ -0,0 +1,990 @@
+import contextlib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+import pandas as pd
+from gspread.exceptions import WorksheetNotFound
+
+from typedframe import append_rows, denormalize, normalize
+
+# Kolom awal tiap sheet; kolom baru ditambahkan otomatis saat append
+SCHEMA = {
+    "cleaning_logs": ["tanggal", "tugas", "sebelum", "sesudah", "keterangan", "status", "sebelum_thumb", "sesudah_thumb", "id",
+                      "site_id", "worker_id", "sebelum_duplikat", "sesudah_duplikat"],
+    "cleaning_reports": ["tanggal", "area", "masalah", "foto", "tipe", "foto_thumb", "id", "site_id", "worker_id",
+                         "foto_duplikat"],
+}
+INDEXES = {
+    "cleaning_logs": ["tanggal", "tugas"],
+    "cleaning_reports": ["tanggal", "tipe"],
+}
+# Sheet yang dipecah per bulan ("cleaning_logs_2026-10") berdasarkan kolom ini
+PARTITIONS = {
+    "cleaning_logs": "tanggal",
+}
+_PARTITION_RE = re.compile(r"(.+)_(\d{4}-\d{2})")
+# Kolom identitas baris; append ke sheet ini menjadi upsert berdasarkan kolom tsb
+ROW_KEYS = {
+    "cleaning_logs": "id",
+    "cleaning_reports": "id",
+}
+
+
+# Byte isi sel yang dibaca backend di thread ini (kumulatif, lihat bytes_read)
+_READ = threading.local()
+
+
+class WriteConflict(Exception):
+    # Revisi sheet sudah berubah sejak dibaca; baca ulang, gabungkan, coba lagi
+    pass
+
+
+class Storage:
+    # columns=None berarti semua kolom; selain itu hanya kolom yang diminta
+    # yang diambil dari backend (kolom foto tidak ikut ditransfer).
+    # start/end (YYYY-MM-DD, inklusif) membatasi baris lewat kolom tanggal.
+    def read(self, sheet_name, columns=None, start=None, end=None):
+        raise NotImplementedError
+
+    def read_rows(self, sheet_name, keys, columns):
+        # keys = index baris dari hasil read(); backend boleh mengambil lebih hemat
+        data = self.read(sheet_name, columns)
+        return data.loc[[k for k in keys if k in data.index]]
+
+    def iter_chunks(self, sheet_name, columns=None, start=None, end=None, chunk_size=10000):
+        # Baris dalam potongan <= chunk_size untuk export besar; backend yang
+        # bisa membaca bertahap (SQLite) tidak pernah memuat semuanya sekaligus
+        data = self.read(sheet_name, columns, start, end)
+        for i in range(0, len(data), chunk_size):
+            yield data.iloc[i:i + chunk_size]
+
+    # Backend menyimpan revisi per sheet fisik (termasuk tiap partisi) yang
+    # naik 1 setiap tulis. expected_revision membuat tulis menjadi
+    # compare-and-swap: kalau revisi sudah berbeda, WriteConflict.
+    def revision(self, sheet_name):
+        raise NotImplementedError
+
+    def append(self, sheet_name, data, expected_revision=None):
+        raise NotImplementedError
+
+    def update(self, sheet_name, data, expected_revision=None):
+        raise NotImplementedError
+
+    def write_lock(self):
+        # Lock tulis backend yang boleh ditahan pemanggil selama baca-lalu-tulis
+        # (KeyedStorage); bawaan tidak ada, cukup compare-and-swap
+        return contextlib.nullcontext()
+
+    # Sinkron bertahap: (revisi, jumlah tulis ulang) per sheet fisik. append
+    # hanya menaikkan revisi; update / update_rows (isi baris lama berubah)
+    # menaikkan keduanya. Bawaan: setiap perubahan dianggap tulis ulang.
+    def sync_state(self, sheet_name):
+        revision = self.revision(sheet_name)
+        return revision, revision
+
+    def sync_states(self, sheet_names):
+        # Backend yang bisa membaca semua sekaligus (GSheets) menimpa ini
+        return {name: self.sync_state(name) for name in sheet_names}
+
+    def read_after(self, sheet_name, columns=None, start=None, end=None, after=None):
+        # (baris dengan key > after, key terakhir di sheet); after=None = semua
+        data = self.read(sheet_name, columns, start, end)
+        return data, None
+
+    def read_incremental(self, sheet_name, columns=None, start=None, end=None, since=None, state=None):
+        # since = penanda dari panggilan sebelumnya (revisi, tulis ulang, key
+        # terakhir). Hasil (data, penanda, bertahap): bertahap=True berarti
+        # data hanya baris baru yang perlu digabung ke hasil sebelumnya.
+        # state = sync_state yang sudah dibaca pemanggil (opsional).
+        revision, rewrites = state or self.sync_state(sheet_name)
+        if since is not None and since[:2] == (revision, rewrites):
+            return pd.DataFrame(columns=columns), since, True
+        after = since[2] if since is not None and since[1] == rewrites and since[2] is not None else None
+        data, last = self.read_after(sheet_name, columns, start, end, after)
+        return data, (revision, rewrites, last), after is not None
+
+    def update_rows(self, sheet_name, keys, data, expected_revision=None):
+        # Timpa kolom `data` pada baris `keys` (index dari read()), urutan sama
+        raise NotImplementedError
+
+    def list_sheets(self):
+        raise NotImplementedError
+
+
+# --- PENYIMPANAN GOOGLE SHEETS ---
+# Revisi disimpan di worksheet "_revisions" (sheet, revision). Sheets API tidak
+# punya tulis bersyarat, jadi cek + tulis + naikkan revisi diserialkan dengan
+# lock proses per spreadsheet; semua sesi Streamlit di satu server aman,
+# antar-server tidak. Tiap shard (sekolah) punya lock sendiri.
+_GSHEETS_WRITE_LOCKS = {}
+_GSHEETS_LOCKS_GUARD = threading.Lock()
+REVISIONS_SHEET = "_revisions"
+REVISIONS_HEADER = ["sheet", "revision", "rewrites"]
+
+
+class GSheetsStorage(Storage):
+    def __init__(self, conn):
+        self.conn = conn
+        with _GSHEETS_LOCKS_GUARD:
+            self._write_lock = _GSHEETS_WRITE_LOCKS.setdefault(id(conn), threading.RLock())
+        self._worksheets = {}
+        self._headers = {}
+
+    def read(self, sheet_name, columns=None, start=None, end=None):
+        return self.read_after(sheet_name, columns, start, end)[0]
+
+    def read_after(self, sheet_name, columns=None, start=None, end=None, after=None):
+        ws = self._worksheet(sheet_name, create=False)
+        first = 0 if after is None else after + 1
+        if ws is None:
+            return pd.DataFrame(columns=columns), None
+        if columns is None:
+            data = self.conn.read(worksheet=sheet_name, ttl="0s")
+            _count_read(_payload_bytes(data))
+            last = len(data) - 1
+            return _filter_dates(data.iloc[first:], start, end), last
+        header = self._header(sheet_name, ws)
+        # Kolom tanggal selalu ikut supaya jumlah baris (key terakhir) akurat
+        fetch = list(columns) if "tanggal" in columns else list(columns) + ["tanggal"]
+        present = [c for c in fetch if c in header]
+        if not present:
+            return pd.DataFrame(columns=columns), None
+        # Satu request batch_get, hanya kolom terpilih mulai baris data `first`
+        ranges = [f"{_col_letter(header.index(c))}{first + 2}:{_col_letter(header.index(c))}" for c in present]
+        results = ws.batch_get(ranges, major_dimension="COLUMNS")
+        values = [r[0] if r else [] for r in results]
+        _count_read(sum(len(str(v)) for col in values for v in col))
+        n = max(len(v) for v in values)
+        data = pd.DataFrame({c: v + [""] * (n - len(v)) for c, v in zip(present, values)},
+                            index=pd.RangeIndex(first, first + n))
+        return _filter_dates(data, start, end).reindex(columns=columns), first + n - 1
+
+    def read_rows(self, sheet_name, keys, columns):
+        # Index baris = posisi data, baris sheet = posisi + 2 (setelah header)
+        ws = self._worksheet(sheet_name, create=False)
+        keys = list(keys)
+        if ws is None:
+            return pd.DataFrame(index=keys, columns=columns)
+        header = self._header(sheet_name, ws)
+        present = [c for c in columns if c in header]
+        if not keys or not present:
+            return pd.DataFrame(index=keys, columns=columns)
+        ranges = [f"{_col_letter(header.index(c))}{k + 2}" for k in keys for c in present]
+        results = ws.batch_get(ranges)
+        cells = iter(r[0][0] if r and r[0] else "" for r in results)
+        rows = [{c: next(cells) for c in present} for _ in keys]
+        data = pd.DataFrame(rows, index=keys)
+        _count_read(_payload_bytes(data))
+        return data.reindex(columns=columns)
+
+    def update(self, sheet_name, data, expected_revision=None):
+        # Tulis ulang seluruh sheet (dipakai untuk migrasi / perbaikan data)
+        with self._write_lock:
+            if self._worksheet(sheet_name, create=not data.empty) is None:
+                return
+            state = self._check(sheet_name, expected_revision)
+            self.conn.update(worksheet=sheet_name, data=data)
+            # conn.update mengubah ukuran grid lewat objek worksheet lain
+            self._headers.pop(sheet_name, None)
+            self._worksheets.pop(sheet_name, None)
+            self._bump(sheet_name, state, rewrite=True)
+
+    def write_lock(self):
+        # RLock: append/update_rows di dalamnya mengambil lock yang sama lagi
+        return self._write_lock
+
+    def list_sheets(self):
+        titles = [ws.title for ws in self.conn.client._open_spreadsheet().worksheets()]
+        return [t for t in titles if t != REVISIONS_SHEET]
+
+    def revision(self, sheet_name):
+        return self._revisions().get(sheet_name, (0, None, 0))[0]
+
+    def sync_state(self, sheet_name):
+        return self.sync_states([sheet_name])[sheet_name]
+
+    def sync_states(self, sheet_names):
+        # Satu request untuk semua partisi
+        revisions = self._revisions()
+        return {name: revisions.get(name, (0, None, 0))[::2] for name in sheet_names}
+
+    def append(self, sheet_name, data, expected_revision=None):
+        # Hanya baris baru yang dikirim, histori lama tidak dibaca ulang
+        if data.empty:
+            return
+        with self._write_lock:
+            ws = self._worksheet(sheet_name)
+            state = self._check(sheet_name, expected_revision)
+            header = self._extend_header(sheet_name, ws, data.columns)
+            rows = data.reindex(columns=header).astype(object)
+            rows = rows.where(rows.notna(), "")
+            ws.append_rows(rows.values.tolist(), value_input_option="RAW")
+            self._bump(sheet_name, state)
+
+    def update_rows(self, sheet_name, keys, data, expected_revision=None):
+        # Satu request batch_update, hanya sel kolom `data` di baris terkait
+        if data.empty:
+            return
+        with self._write_lock:
+            ws = self._worksheet(sheet_name)
+            state = self._check(sheet_name, expected_revision)
+            header = self._extend_header(sheet_name, ws, data.columns)
+            rows = data.astype(object).where(data.notna(), "")
+            updates = [
+                {"range": f"{_col_letter(header.index(c))}{int(k) + 2}", "values": [[v]]}
+                for k, (_, row) in zip(keys, rows.iterrows()) for c, v in row.items()
+            ]
+            ws.batch_update(updates, value_input_option="RAW")
+            self._bump(sheet_name, state, rewrite=True)
+
+    def _revisions(self):
+        # {sheet: (revisi, nomor baris di _revisions, jumlah tulis ulang)}
+        ws = self._worksheet(REVISIONS_SHEET, create=False)
+        if ws is None:
+            return {}
+        return {r[0]: (int(r[1] or 0), i, int(r[2] or 0) if len(r) > 2 else 0)
+                for i, r in enumerate(ws.get_all_values()[1:], 2) if len(r) > 1 and r[0]}
+
+    # Keduanya dipanggil di dalam lock: _check sebelum data ditulis, _bump
+    # SESUDAHNYA. Pembaca yang melihat revisi baru dengan begitu pasti juga
+    # melihat barisnya; kalau revisi naik lebih dulu, pembaca bisa mencatat
+    # revisi baru tanpa baris baru (index KeyedStorage / penanda sinkron
+    # bertahap) dan baris itu tidak pernah terbaca.
+    def _check(self, sheet_name, expected_revision):
+        state = self._revisions().get(sheet_name, (0, None, 0))
+        if expected_revision is not None and state[0] != expected_revision:
+            raise WriteConflict(f"{sheet_name}: revisi {state[0]}, diharapkan {expected_revision}")
+        return state
+
+    def _bump(self, sheet_name, state, rewrite=False):
+        current, row, rewrites = state
+        ws = self._worksheet(REVISIONS_SHEET)
+        # Sheet _revisions lama hanya punya 2 kolom
+        self._extend_header(REVISIONS_SHEET, ws, REVISIONS_HEADER)
+        values = [str(current + 1), str(rewrites + 1 if rewrite else rewrites)]
+        if row is None:
+            ws.append_rows([[sheet_name] + values], value_input_option="RAW")
+        else:
+            ws.batch_update([{"range": f"{c}{row}", "values": [[v]]} for c, v in zip("BC", values)],
+                            value_input_option="RAW")
+
+    def _extend_header(self, sheet_name, ws, columns):
+        header = self._header(sheet_name, ws)
+        new_cols = [str(c) for c in columns if c not in header]
+        if new_cols:
+            header = header + new_cols
+            # Tulis nilai mentah tidak memperbesar grid; kolom di luar grid ditolak API
+            if len(header) > ws.col_count:
+                ws.add_cols(len(header) - ws.col_count)
+            ws.update(range_name="A1", values=[header])
+            self._headers[sheet_name] = header
+        return header
+
+    def _worksheet(self, sheet_name, create=True):
+        # Worksheet partisi bulan baru dibuat saat pertama kali ditulis
+        if sheet_name not in self._worksheets:
+            spreadsheet = self.conn.client._open_spreadsheet()
+            try:
+                ws = spreadsheet.worksheet(sheet_name)
+            except WorksheetNotFound:
+                if not create:
+                    return None
+                header = REVISIONS_HEADER if sheet_name == REVISIONS_SHEET else SCHEMA.get(_base_sheet(sheet_name), [])
+                ws = spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=max(len(header), 1))
+                if header:
+                    ws.update(range_name="A1", values=[header])
+            self._worksheets[sheet_name] = ws
+        return self._worksheets[sheet_name]
+
+    def _header(self, sheet_name, ws):
+        if sheet_name not in self._headers:
+            self._headers[sheet_name] = [h for h in ws.row_values(1) if h]
+        return self._headers[sheet_name]
+
+
+# --- PENYIMPANAN SQLITE LOKAL ---
+class SQLiteStorage(Storage):
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS _revisions (sheet TEXT PRIMARY KEY, revision INTEGER NOT NULL)")
+        if "rewrites" not in [r[1] for r in self._db.execute("PRAGMA table_info(_revisions)")]:
+            self._db.execute("ALTER TABLE _revisions ADD COLUMN rewrites INTEGER NOT NULL DEFAULT 0")
+        self._columns = {}
+        for sheet_name in SCHEMA:
+            self._ensure_table(sheet_name, SCHEMA[sheet_name])
+
+    def read(self, sheet_name, columns=None, start=None, end=None):
+        return self.read_after(sheet_name, columns, start, end)[0]
+
+    def read_after(self, sheet_name, columns=None, start=None, end=None, after=None):
+        # Index baris = rowid; rentang tanggal memakai index tanggal
+        with self._lock:
+            known = self._ensure_table(sheet_name, [], create=False)
+            if not known:
+                return pd.DataFrame(columns=columns), None
+            cols = known if columns is None else [c for c in columns if c in known]
+            where, params = _date_clause(known, start, end)
+            if after is not None:
+                where = f"{where} AND rowid > ?" if where else "WHERE rowid > ?"
+                params = list(params) + [int(after)]
+            clause = f"{where} ORDER BY rowid"
+            last = self._db.execute(f"SELECT max(rowid) FROM {_quote(sheet_name)}").fetchone()[0]
+            data = self._select(sheet_name, cols, clause, params).reindex(columns=columns or cols)
+            return data, last if last is not None else after
+
+    def read_rows(self, sheet_name, keys, columns):
+        keys = [int(k) for k in keys]
+        with self._lock:
+            known = self._ensure_table(sheet_name, [], create=False)
+            cols = [c for c in columns if c in known]
+            if not keys or not cols:
+                return pd.DataFrame(index=keys, columns=columns)
+            marks = ", ".join("?" for _ in keys)
+            data = self._select(sheet_name, cols, f"WHERE rowid IN ({marks})", keys)
+            return data.reindex(index=keys, columns=columns)
+
+    def iter_chunks(self, sheet_name, columns=None, start=None, end=None, chunk_size=10000):
+        # Koneksi baca terpisah (WAL) supaya tulis lain tidak tertahan selama export
+        with self._lock:
+            known = self._ensure_table(sheet_name, [], create=False)
+        if not known:
+            return
+        cols = known if columns is None else [c for c in columns if c in known]
+        where, params = _date_clause(known, start, end)
+        select = ", ".join(_quote(c) for c in cols)
+        db = sqlite3.connect(self.path)
+        try:
+            cursor = db.execute(f"SELECT {select} FROM {_quote(sheet_name)} {where} ORDER BY rowid", params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                data = pd.DataFrame(rows, columns=cols)
+                _count_read(_payload_bytes(data))
+                yield data.reindex(columns=columns or cols)
+        finally:
+            db.close()
+
+    def _select(self, sheet_name, cols, clause, params):
+        select = ", ".join(["rowid"] + [_quote(c) for c in cols])
+        data = pd.read_sql_query(f"SELECT {select} FROM {_quote(sheet_name)} {clause}", self._db, params=params)
+        data = data.set_index("rowid")
+        data.index.name = None
+        _count_read(_payload_bytes(data))
+        return data
+
+    def revision(self, sheet_name):
+        with self._lock:
+            return self._revision(sheet_name)
+
+    def sync_state(self, sheet_name):
+        with self._lock:
+            row = self._db.execute("SELECT revision, rewrites FROM _revisions WHERE sheet = ?", (sheet_name,)).fetchone()
+            return tuple(row) if row else (0, 0)
+
+    def append(self, sheet_name, data, expected_revision=None):
+        if data.empty:
+            return
+        with self._lock, self._db:
+            self._claim(sheet_name, expected_revision)
+            self._insert(sheet_name, data)
+
+    def update_rows(self, sheet_name, keys, data, expected_revision=None):
+        if data.empty:
+            return
+        cols = [str(c) for c in data.columns]
+        rows = data.astype(object).where(data.notna(), None).values.tolist()
+        assignments = ", ".join(f"{_quote(c)} = ?" for c in cols)
+        with self._lock, self._db:
+            self._claim(sheet_name, expected_revision, rewrite=True)
+            self._ensure_table(sheet_name, cols)
+            self._db.executemany(
+                f"UPDATE {_quote(sheet_name)} SET {assignments} WHERE rowid = ?",
+                [row + [int(k)] for k, row in zip(keys, rows)],
+            )
+
+    def update(self, sheet_name, data, expected_revision=None):
+        with self._lock, self._db:
+            self._claim(sheet_name, expected_revision, rewrite=True)
+            if self._ensure_table(sheet_name, [], create=not data.empty):
+                self._db.execute(f"DELETE FROM {_quote(sheet_name)}")
+            if not data.empty:
+                self._insert(sheet_name, data)
+
+    def list_sheets(self):
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT name FROM sqlite_master WHERE type = 'table'") if r[0] != "_revisions"]
+
+    def _revision(self, sheet_name):
+        row = self._db.execute("SELECT revision FROM _revisions WHERE sheet = ?", (sheet_name,)).fetchone()
+        return row[0] if row else 0
+
+    def _claim(self, sheet_name, expected_revision, rewrite=False):
+        # BEGIN IMMEDIATE mengunci database untuk tulis sebelum revisi dicek,
+        # jadi cek + tulis atomik juga antar proses
+        self._db.execute("BEGIN IMMEDIATE")
+        current = self._revision(sheet_name)
+        if expected_revision is not None and current != expected_revision:
+            raise WriteConflict(f"{sheet_name}: revisi {current}, diharapkan {expected_revision}")
+        self._db.execute(
+            "INSERT INTO _revisions (sheet, revision, rewrites) VALUES (?, 1, ?) "
+            "ON CONFLICT(sheet) DO UPDATE SET revision = revision + 1, rewrites = rewrites + excluded.rewrites",
+            (sheet_name, int(rewrite)),
+        )
+
+    def _insert(self, sheet_name, data):
+        cols = [str(c) for c in data.columns]
+        self._ensure_table(sheet_name, cols)
+        rows = data.astype(object).where(data.notna(), None).values.tolist()
+        names = ", ".join(_quote(c) for c in cols)
+        marks = ", ".join("?" for _ in cols)
+        self._db.executemany(f"INSERT INTO {_quote(sheet_name)} ({names}) VALUES ({marks})", rows)
+
+    def _ensure_table(self, sheet_name, cols, create=True):
+        # create=False: tabel yang belum ada (mis. partisi bulan kosong) tidak dibuat
+        table = _quote(sheet_name)
+        known = self._columns.get(sheet_name)
+        if known is None:
+            exists = self._db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (sheet_name,)
+            ).fetchone()
+            if not exists and not create:
+                return []
+            initial = SCHEMA.get(_base_sheet(sheet_name)) or cols
+            if not initial:
+                return []
+            columns = ", ".join(f"{_quote(c)} TEXT" for c in initial)
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+            for col in INDEXES.get(_base_sheet(sheet_name), []):
+                index = _quote(f"idx_{sheet_name}_{col}")
+                self._db.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({_quote(col)})")
+            known = [r[1] for r in self._db.execute(f"PRAGMA table_info({table})")]
+            self._columns[sheet_name] = known
+        for col in cols:
+            if col not in known:
+                self._db.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(col)} TEXT")
+                known.append(col)
+        return known
+
+
+# --- PARTISI PER BULAN ---
+# Baris sheet di PARTITIONS ditulis ke sheet fisik "<sheet>_YYYY-MM" sesuai
+# kolom tanggalnya; baca dengan rentang tanggal hanya membuka partisi yang
+# beririsan. Sheet asli hanya menampung baris tanpa tanggal yang valid
+# (dan histori lama sebelum migrate_partitions.py dijalankan).
+# Index hasil read berbentuk "YYYY-MM:<index partisi>" agar read_rows tahu
+# partisi asal tiap baris.
+class PartitionedStorage(Storage):
+    def __init__(self, inner, partitions=PARTITIONS):
+        self.inner = inner
+        self.partitions = partitions
+
+    def read(self, sheet_name, columns=None, start=None, end=None):
+        if sheet_name not in self.partitions:
+            return self.inner.read(sheet_name, columns, start, end)
+        frames = []
+        for month in self._months(sheet_name, start, end):
+            data = self.inner.read(_partition_name(sheet_name, month), columns, start, end)
+            if not data.empty:
+                data.index = [f"{month}:{k}" for k in data.index]
+                frames.append(data)
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        data = pd.concat(frames)
+        return data.reindex(columns=columns) if columns is not None else data
+
+    def read_incremental(self, sheet_name, columns=None, start=None, end=None, since=None):
+        # Penanda = {bulan: penanda sheet partisi}. Partisi bulan baru (belum
+        # ada di penanda) seluruhnya baris baru; kalau ada partisi yang ditulis
+        # ulang, semua partisi dibaca penuh sekali lagi.
+        if sheet_name not in self.partitions:
+            return self.inner.read_incremental(sheet_name, columns, start, end, since)
+        frames, marks, incremental = [], {}, since is not None
+        months = self._months(sheet_name, start, end)
+        states = self.inner.sync_states([_partition_name(sheet_name, m) for m in months])
+        for month in months:
+            name = _partition_name(sheet_name, month)
+            previous = since.get(month) if since is not None else None
+            data, marks[month], part_incremental = self.inner.read_incremental(
+                name, columns, start, end, previous, states[name])
+            if previous is not None and not part_incremental:
+                return self.read_incremental(sheet_name, columns, start, end, None)
+            if not data.empty:
+                data.index = [f"{month}:{k}" for k in data.index]
+                frames.append(data)
+        if not frames:
+            return pd.DataFrame(columns=columns), marks, incremental
+        data = pd.concat(frames)
+        return (data.reindex(columns=columns) if columns is not None else data), marks, incremental
+
+    def iter_chunks(self, sheet_name, columns=None, start=None, end=None, chunk_size=10000):
+        # Satu partisi bulan dibaca pada satu waktu
+        if sheet_name not in self.partitions:
+            yield from self.inner.iter_chunks(sheet_name, columns, start, end, chunk_size)
+            return
+        for month in self._months(sheet_name, start, end):
+            yield from self.inner.iter_chunks(_partition_name(sheet_name, month), columns, start, end, chunk_size)
+
+    def read_rows(self, sheet_name, keys, columns):
+        if sheet_name not in self.partitions:
+            return self.inner.read_rows(sheet_name, keys, columns)
+        keys = list(keys)
+        groups = {}
+        for key in keys:
+            month, inner_key = str(key).split(":", 1)
+            groups.setdefault(month, []).append(int(inner_key))
+        frames = []
+        for month, inner_keys in groups.items():
+            data = self.inner.read_rows(_partition_name(sheet_name, month), inner_keys, columns)
+            data.index = [f"{month}:{k}" for k in data.index]
+            frames.append(data)
+        if not frames:
+            return pd.DataFrame(index=keys, columns=columns)
+        return pd.concat(frames).reindex(index=keys, columns=columns)
+
+    def append(self, sheet_name, data):
+        if sheet_name not in self.partitions:
+            return self.inner.append(sheet_name, data)
+        for name, part in self._split(sheet_name, data).items():
+            self.inner.append(name, part)
+
+    def update_rows(self, sheet_name, keys, data):
+        if sheet_name not in self.partitions:
+            return self.inner.update_rows(sheet_name, keys, data)
+        groups = {}
+        for i, key in enumerate(keys):
+            month, inner_key = str(key).split(":", 1)
+            groups.setdefault(month, ([], []))
+            groups[month][0].append(int(inner_key))
+            groups[month][1].append(i)
+        for month, (inner_keys, positions) in groups.items():
+            self.inner.update_rows(_partition_name(sheet_name, month), inner_keys, data.iloc[positions])
+
+    def update(self, sheet_name, data):
+        # Tulis ulang semua partisi; baris lama di sheet asli ikut dipindah.
+        # Urutan: partisi berisi dulu, lalu partisi yang dikosongkan, sheet
+        # asli terakhir. Kalau gagal di tengah (mis. kuota API), baris bisa
+        # sementara ada dua kali tapi tidak ada yang hilang; ulangi saja
+        if sheet_name not in self.partitions:
+            return self.inner.update(sheet_name, data)
+        parts = self._split(sheet_name, _drop_base_copies(data).reset_index(drop=True))
+        names = [_partition_name(sheet_name, m) for m in self._months(sheet_name, None, None)]
+        order = [n for n in parts if n != sheet_name]
+        order += [n for n in names if n not in parts and n != sheet_name]
+        for name in order + [sheet_name]:
+            self.inner.update(name, parts.get(name, data.iloc[0:0]))
+
+    def list_sheets(self):
+        return self.inner.list_sheets()
+
+    def revision(self, sheet_name):
+        return self.inner.revision(sheet_name)
+
+    def _split(self, sheet_name, data):
+        # {nama sheet fisik: baris}, baris tanpa tanggal YYYY-MM-.. ke sheet asli
+        col = self.partitions[sheet_name]
+        if col not in data.columns:
+            return {sheet_name: data}
+        months = data[col].astype(str).str[:7]
+        months = months.where(months.str.fullmatch(r"\d{4}-\d{2}"), "")
+        return {_partition_name(sheet_name, m): part for m, part in data.groupby(months, sort=False)}
+
+    def _months(self, sheet_name, start, end):
+        # "" = sheet asli, hanya ikut dibaca kalau rentang tidak dibatasi
+        if start is not None and end is not None:
+            return _month_range(start[:7], end[:7])
+        prefix = sheet_name + "_"
+        months = sorted(
+            name[len(prefix):] for name in self.inner.list_sheets()
+            if name.startswith(prefix) and _PARTITION_RE.fullmatch(name)
+        )
+        months = [m for m in months if (start is None or m >= start[:7]) and (end is None or m <= end[:7])]
+        return [""] + months if start is None and end is None else months
+
+
+# --- UPSERT BERDASARKAN ID BARIS ---
+# append() ke sheet di ROW_KEYS menimpa baris dengan id yang sudah ada
+# (submit ganda / rerun / kirim ulang antrean) dan hanya menambah id baru.
+# Index id -> key baris disimpan di memori per sheet fisik bersama revisi
+# saat index dibangun; selama revisi backend masih sama, cek duplikat O(1).
+# Tulis memakai compare-and-swap pada revisi tsb. Kalau penulis lain
+# menyela (WriteConflict), index dibangun ulang dari data terbaru lalu
+# baris digabung dan ditulis ulang.
+class KeyedStorage(Storage):
+    def __init__(self, inner, keys=ROW_KEYS, retries=10):
+        self.inner = inner
+        self.keys = keys
+        self.retries = retries
+        self.conflicts = 0
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def read(self, sheet_name, columns=None, start=None, end=None):
+        return self.inner.read(sheet_name, columns, start, end)
+
+    def read_incremental(self, sheet_name, columns=None, start=None, end=None, since=None, state=None):
+        return self.inner.read_incremental(sheet_name, columns, start, end, since, state)
+
+    def sync_states(self, sheet_names):
+        return self.inner.sync_states(sheet_names)
+
+    def read_rows(self, sheet_name, keys, columns):
+        return self.inner.read_rows(sheet_name, keys, columns)
+
+    def iter_chunks(self, sheet_name, columns=None, start=None, end=None, chunk_size=10000):
+        return self.inner.iter_chunks(sheet_name, columns, start, end, chunk_size)
+
+    def revision(self, sheet_name):
+        return self.inner.revision(sheet_name)
+
+    def append(self, sheet_name, data):
+        key = self.keys.get(_base_sheet(sheet_name))
+        if key is None or key not in data.columns or data.empty:
+            return self.inner.append(sheet_name, data)
+        data = data.reset_index(drop=True)
+        ids = data[key].fillna("").astype(str)
+        # Baris tanpa id (data lama) selalu ditambahkan
+        keep = (ids == "") | ~ids.duplicated(keep="last")
+        data, ids = data[keep], ids[keep]
+        with self._lock:
+            for attempt in range(self.retries):
+                try:
+                    # Baca index + tulis di bawah lock backend: penulis lain di
+                    # proses ini tidak bisa menyelinap; CAS tinggal menjaga antar proses
+                    with self.inner.write_lock():
+                        return self._upsert(sheet_name, key, data, ids)
+                except WriteConflict:
+                    self.conflicts += 1
+                    self._index.pop(sheet_name, None)
+                    # Jeda acak bertambah supaya penulis yang bentrok tidak terus bertabrakan
+                    time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+            with self.inner.write_lock():
+                return self._upsert(sheet_name, key, data, ids)
+
+    def _upsert(self, sheet_name, key, data, ids):
+        revision, index = self._ids(sheet_name, key)
+        known = ids.map(lambda i: i in index)
+        if known.any() and any(index[i] is None for i in ids[known]):
+            # Baris yang baru di-append belum punya key; bangun ulang index
+            self._index.pop(sheet_name, None)
+            revision, index = self._ids(sheet_name, key)
+        if known.any():
+            self.inner.update_rows(sheet_name, [index[i] for i in ids[known]], data[known], expected_revision=revision)
+            revision += 1
+        if not known.all():
+            self.inner.append(sheet_name, data[~known], expected_revision=revision)
+            revision += 1
+            for i in ids[~known]:
+                if i:
+                    index[i] = None
+        self._index[sheet_name] = (revision, index)
+
+    def update(self, sheet_name, data):
+        with self._lock:
+            self._index.pop(sheet_name, None)
+            self.inner.update(sheet_name, data)
+
+    def update_rows(self, sheet_name, keys, data):
+        with self._lock:
+            self._index.pop(sheet_name, None)
+            self.inner.update_rows(sheet_name, keys, data)
+
+    def list_sheets(self):
+        return self.inner.list_sheets()
+
+    def _ids(self, sheet_name, key):
+        # Index dipakai ulang hanya kalau revisi backend belum berubah
+        revision = self.inner.revision(sheet_name)
+        cached = self._index.get(sheet_name)
+        if cached is None or cached[0] != revision:
+            ids = self.inner.read(sheet_name, [key])[key].fillna("").astype(str)
+            cached = (revision, {i: k for k, i in ids.items() if i})
+            self._index[sheet_name] = cached
+        return cached
+
+
+# --- FRAME BERTIPE ---
+# read() mengembalikan frame hasil typedframe.normalize (tanggal datetime64,
+# kolom berulang category, urut tanggal) sehingga yang disimpan cache sudah
+# ringkas; tulis dikembalikan ke string lebih dulu. iter_chunks tetap string
+# apa adanya untuk export / laporan lengkap.
+# Tanggal yang bukan YYYY-MM-DD menjadi NaT saat dibaca dan kosong saat
+# ditulis kembali, jadi skrip yang menulis ulang isi sheet hasil read() (migrasi)
+# membuat storage dengan config typed = false (tanpa lapisan ini).
+class TypedStorage(Storage):
+    def __init__(self, inner):
+        self.inner = inner
+
+    def read(self, sheet_name, columns=None, start=None, end=None):
+        return normalize(self.inner.read(sheet_name, columns, start, end))
+
+    def read_incremental(self, sheet_name, columns=None, start=None, end=None, since=None):
+        data, marks, incremental = self.inner.read_incremental(sheet_name, columns, start, end, since)
+        return normalize(data), marks, incremental
+
+    def read_rows(self, sheet_name, keys, columns):
+        return self.inner.read_rows(sheet_name, keys, columns)
+
+    def iter_chunks(self, sheet_name, columns=None, start=None, end=None, chunk_size=10000):
+        return self.inner.iter_chunks(sheet_name, columns, start, end, chunk_size)
+
+    def revision(self, sheet_name):
+        return self.inner.revision(sheet_name)
+
+    def append(self, sheet_name, data):
+        self.inner.append(sheet_name, denormalize(data))
+
+    def update(self, sheet_name, data):
+        self.inner.update(sheet_name, denormalize(data))
+
+    def update_rows(self, sheet_name, keys, data):
+        self.inner.update_rows(sheet_name, keys, denormalize(data))
+
+    def list_sheets(self):
+        return self.inner.list_sheets()
+
+
+# --- CACHE ANTAR RERUN ---
+# Hasil read disimpan per sheet selama `ttl` detik untuk semua sesi; setiap
+# tulis ke sheet tersebut membuat entrinya kedaluwarsa. Entri kedaluwarsa
+# tidak dibuang: penyegaran memakai read_incremental dengan penanda entri,
+# jadi hanya baris baru sejak baca terakhir yang ditransfer lalu digabung ke
+# frame di cache. Entri yang sama juga dipakai jika backend tidak terjangkau.
+# Tiap sheet menyimpan paling banyak max_entries key (rentang tanggal, daftar
+# baris foto); yang paling lama tidak dipakai dibuang lebih dulu, jadi server
+# yang berjalan lama tidak menumpuk satu entri per tanggal/halaman dibuka.
+class CachedStorage(Storage):
+    def __init__(self, inner, ttl, max_entries=64):
+        self.inner = inner
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.incremental = 0
+        self.stale_reads = 0
+        self.last_error = None
+        self._local = threading.local()
+        # {sheet: {key: (waktu simpan, data, penanda read_incremental)}}, urut
+        # dari yang paling lama tidak dipakai
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def read(self, sheet_name, columns=None, start=None, end=None):
+        key = ("read", tuple(columns) if columns is not None else None, start, end)
+        return self._cached(sheet_name, key,
+                            lambda since: self.inner.read_incremental(sheet_name, columns, start, end, since))
+
+    def read_rows(self, sheet_name, keys, columns):
+        key = ("rows", tuple(keys), tuple(columns))
+        return self._cached(sheet_name, key, lambda since: (self.inner.read_rows(sheet_name, keys, columns), None, False))
+
+    def iter_chunks(self, sheet_name, columns=None, start=None, end=None, chunk_size=10000):
+        # Export tidak disimpan di cache
+        return self.inner.iter_chunks(sheet_name, columns, start, end, chunk_size)
+
+    def _cached(self, sheet_name, key, fetch):
+        with self._lock:
+            entries = self._entries.setdefault(sheet_name, {})
+            entry = entries.pop(key, None)
+            if entry is not None:
+                entries[key] = entry
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self.hits += 1
+                self._local.last = ("cache", 0)
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+        try:
+            data, marks, incremental = fetch(entry[2] if entry else None)
+        except Exception as e:
+            with self._lock:
+                self.last_error = e
+                if entry is None:
+                    raise
+                self.stale_reads += 1
+                self._local.last = ("basi", 0)
+                return entry[1]
+        self._local.last = ("bertahap" if incremental else "penuh", len(data))
+        if incremental:
+            # Tanpa baris baru frame lama dipakai apa adanya (index tugas ikut awet)
+            data = entry[1] if data.empty else append_rows(entry[1], data)
+        with self._lock:
+            self.last_error = None
+            self.incremental += incremental
+            # Ada tulis di tengah jalan: simpan, tapi langsung kedaluwarsa
+            stored = time.monotonic() if generation == self._generation else float("-inf")
+            entries = self._entries.setdefault(sheet_name, {})
+            entries.pop(key, None)
+            entries[key] = (stored, data, marks)
+            while len(entries) > self.max_entries:
+                del entries[next(iter(entries))]
+        return data
+
+    def append(self, sheet_name, data):
+        try:
+            self.inner.append(sheet_name, data)
+        finally:
+            self.invalidate(sheet_name)
+
+    def update(self, sheet_name, data):
+        try:
+            self.inner.update(sheet_name, data)
+        finally:
+            self.invalidate(sheet_name)
+
+    def update_rows(self, sheet_name, keys, data):
+        try:
+            self.inner.update_rows(sheet_name, keys, data)
+        finally:
+            self.invalidate(sheet_name)
+
+    def invalidate(self, sheet_name=None):
+        with self._lock:
+            self._generation += 1
+            for name in list(self._entries) if sheet_name is None else [sheet_name]:
+                entries = self._entries.get(name, {})
+                for key, (_, data, marks) in entries.items():
+                    entries[key] = (float("-inf"), data, marks)
+
+    def list_sheets(self):
+        return self.inner.list_sheets()
+
+    def revision(self, sheet_name):
+        return self.inner.revision(sheet_name)
+
+    def last_read(self):
+        # (sumber, baris dari backend) untuk baca terakhir di thread ini:
+        # "cache", "bertahap" (hanya baris baru), "penuh" atau "basi" (backend gagal)
+        return getattr(self._local, "last", (None, 0))
+
+    def stats(self):
+        entries = sum(len(v) for v in self._entries.values())
+        return {"hits": self.hits, "misses": self.misses, "incremental": self.incremental,
+                "entries": entries, "stale_reads": self.stale_reads}
+
+
+def bytes_read():
+    # Total byte isi sel yang dibaca backend (GSheets/SQLite) di thread ini.
+    # Selisih sebelum/sesudah satu panggilan = payload panggilan itu; hasil
+    # dari cache bernilai 0 karena tidak menyentuh backend
+    return getattr(_READ, "nbytes", 0)
+
+
+def _count_read(nbytes):
+    _READ.nbytes = bytes_read() + int(nbytes)
+
+
+def _payload_bytes(data):
+    # Perkiraan ukuran transfer: panjang teks semua sel (sel kosong = 0)
+    return sum(int(data[c].fillna("").astype(str).str.len().sum()) for c in data.columns)
+
+
+def row_id(*parts):
+    # ID baris deterministik dari isi submit: klik ganda / rerun menghasilkan id sama
+    return uuid.uuid5(uuid.NAMESPACE_URL, "|".join(str(p) for p in parts)).hex
+
+
+def _col_letter(i):
+    # 0 -> A, 25 -> Z, 26 -> AA
+    letters = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        letters = chr(65 + r) + letters
+    return letters
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _base_sheet(name):
+    # "cleaning_logs_2026-10" -> "cleaning_logs"
+    m = _PARTITION_RE.fullmatch(name)
+    return m[1] if m and m[1] in PARTITIONS else name
+
+
+def _partition_name(sheet_name, month):
+    return f"{sheet_name}_{month}" if month else sheet_name
+
+
+def _drop_base_copies(data):
+    # Sisa update() yang terputus: baris sheet asli (key ":<n>") yang sudah
+    # ada persis sama di partisi bulannya dibuang supaya ulangan tidak
+    # menggandakannya
+    from_base = pd.Index(data.index.astype(str)).str.startswith(":")
+    if not from_base.any() or from_base.all():
+        return data
+    order = list(range(len(data)))
+    order.sort(key=lambda i: from_base[i])
+    copies = data.iloc[order].astype(str).duplicated().to_numpy() & from_base[order]
+    return data.drop(data.index[[order[i] for i in range(len(order)) if copies[i]]])
+
+
+def _month_range(first, last):
+    # "2026-11", "2027-01" -> ["2026-11", "2026-12", "2027-01"]
+    y, m = int(first[:4]), int(first[5:7])
+    months = []
+    while f"{y:04d}-{m:02d}" <= last:
+        months.append(f"{y:04d}-{m:02d}")
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return months
+
+
+def _date_clause(known, start, end):
+    # WHERE rentang tanggal untuk SQLite (memakai index tanggal)
+    where, params = [], []
+    if "tanggal" in known:
+        if start is not None:
+            where.append('"tanggal" >= ?')
+            params.append(start)
+        if end is not None:
+            where.append('"tanggal" <= ?')
+            params.append(end)
+    return ("WHERE " + " AND ".join(where) if where else ""), params
+
+
+def _filter_dates(data, start, end):
+    if (start is None and end is None) or "tanggal" not in data.columns:
+        return data
+    tanggal = data["tanggal"].astype(str)
+    mask = pd.Series(True, index=data.index)
+    if start is not None:
+        mask &= tanggal >= start
+    if end is not None:
+        mask &= tanggal <= end
+    return data[mask]
+
+
+def create_storage(config, gsheets_conn=None):
+    # config: dict dari [storage] di secrets.toml, mis. backend = "sqlite"
+    backend = config.get("backend", "gsheets")
+    if backend == "sqlite":
+        storage = SQLiteStorage(config.get("path", "data/muhamka.db"))
+    elif backend == "gsheets":
+        storage = GSheetsStorage(gsheets_conn())
+    else:
+        raise ValueError(f"Backend penyimpanan tidak dikenal: {backend}")
+    # partition = false menyimpan cleaning_logs di satu sheet seperti dulu
+    # Upsert per sheet fisik, jadi index id hanya memuat partisi yang ditulis
+    storage = KeyedStorage(storage)
+    if str(config.get("partition", True)).lower() not in ("0", "false", "no"):
+        storage = PartitionedStorage(storage)
+    # typed = false: frame string apa adanya (migrasi baca-lalu-tulis, dengan cache_ttl = 0)
+    if str(config.get("typed", True)).lower() not in ("0", "false", "no"):
+        storage = TypedStorage(storage)
+    # cache_ttl = 0 mematikan cache; cache_entries = batas key per sheet
+    ttl = float(config.get("cache_ttl", 30))
+    return CachedStorage(storage, ttl, int(config.get("cache_entries", 64))) if ttl > 0 else storage
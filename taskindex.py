@@ -0,0 +1,60 @@
+from collections import Counter
+
+import pandas as pd
+
+from typedframe import format_date
+
+DONE = "Selesai"
+PENDING = "menunggu sinkron"
+
+
+# --- INDEX TUGAS HARIAN ---
+# (tanggal, tugas) -> (status, key baris) dibangun sekali per hasil load,
+# sehingga cek "sudah dikerjakan?" di kedua dashboard cukup satu lookup dict
+# alih-alih menyaring seluruh frame untuk setiap item jadwal.
+class TaskIndex:
+    def __init__(self):
+        self._entries = {}
+        self._done_per_day = Counter()
+
+    @classmethod
+    def from_logs(cls, logs):
+        index = cls()
+        if logs.empty:
+            return index
+        status = logs["status"] if "status" in logs else [DONE] * len(logs)
+        dates = logs["tanggal"]
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            dates = dates.dt.strftime("%Y-%m-%d")
+        for tanggal, tugas, st, key in zip(dates, logs["tugas"], status, logs.index):
+            st = st if isinstance(st, str) and st else DONE
+            # Baris jurnal (PENDING) tidak menimpa status yang sudah ada di remote
+            index.add(tanggal, tugas, st, key, overwrite=st != PENDING)
+        return index
+
+    def add(self, tanggal, tugas, status=DONE, key=None, overwrite=True):
+        # Dipanggil juga saat submit, jadi index ikut terbarui tanpa load ulang
+        k = (format_date(tanggal), str(tugas))
+        old = self._entries.get(k)
+        if old is not None and not overwrite:
+            return
+        if old is not None and old[0] == DONE:
+            self._done_per_day[k[0]] -= 1
+        self._entries[k] = (status, key)
+        if status == DONE:
+            self._done_per_day[k[0]] += 1
+
+    def get(self, tanggal, tugas):
+        # (status, key baris) atau None
+        return self._entries.get((format_date(tanggal), str(tugas)))
+
+    def status(self, tanggal, tugas):
+        entry = self.get(tanggal, tugas)
+        return entry[0] if entry else None
+
+    def is_done(self, tanggal, tugas):
+        return self.status(tanggal, tugas) == DONE
+
+    def done_count(self, tanggal):
+        # Jumlah tugas berbeda yang selesai; baris ganda tidak dihitung dua kali
+        return self._done_per_day[format_date(tanggal)]
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+DATE_COLUMN = "tanggal"
+# Kolom dengan sedikit nilai berbeda yang berulang di setiap baris
+CATEGORY_COLUMNS = ("tugas", "tipe", "area", "status", "kategori", "site_id", "worker_id")
+
+
+# --- FRAME BERTIPE ---
+# Hasil baca sheet berisi string semua. normalize() mengubah tanggal menjadi
+# datetime64 (resolusi detik, pandas tidak punya resolusi hari), kolom
+# berulang menjadi category, dan mengurutkan baris per tanggal supaya filter
+# rentang cukup dua searchsorted (date_slice) alih-alih membandingkan string
+# di setiap baris. denormalize() kebalikannya sebelum data ditulis ke sheet.
+def normalize(data):
+    if data.empty and DATE_COLUMN not in data:
+        return data
+    out = data.copy(deep=False)
+    if DATE_COLUMN in out and not pd.api.types.is_datetime64_any_dtype(out[DATE_COLUMN]):
+        out[DATE_COLUMN] = pd.to_datetime(out[DATE_COLUMN], errors="coerce", format="%Y-%m-%d").astype("datetime64[s]")
+    for col in CATEGORY_COLUMNS:
+        if col in out and not isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype("category")
+    if DATE_COLUMN in out and not out[DATE_COLUMN].is_monotonic_increasing:
+        # Stabil: baris di tanggal yang sama tetap berurutan sesuai submit
+        out = out.sort_values(DATE_COLUMN, kind="stable")
+    return out
+
+
+def append_rows(data, new):
+    # Gabung baris baru (sinkron bertahap) ke frame hasil normalize() tanpa
+    # normalize ulang seluruh frame; key yang sama diambil versi terbaru
+    new = normalize(new)
+    if data.empty:
+        return new
+    data, new = data.copy(deep=False), new.copy(deep=False)
+    for col in CATEGORY_COLUMNS:
+        if col in data and col in new and isinstance(data[col].dtype, pd.CategoricalDtype):
+            categories = data[col].cat.categories.union(new[col].cat.categories)
+            data[col] = data[col].cat.set_categories(categories)
+            new[col] = new[col].cat.set_categories(categories)
+    out = pd.concat([data, new])
+    out = out[~out.index.duplicated(keep="last")]
+    if DATE_COLUMN in out and not out[DATE_COLUMN].is_monotonic_increasing:
+        out = out.sort_values(DATE_COLUMN, kind="stable")
+    return out
+
+
+def denormalize(data):
+    out = data.copy(deep=False)
+    for col in out.columns:
+        if pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = out[col].dt.strftime("%Y-%m-%d").astype(object)
+        elif isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype(object)
+    return out
+
+
+def date_slice(data, start=None, end=None):
+    # Baris dengan start <= tanggal <= end (inklusif) dari frame hasil normalize()
+    if data.empty or DATE_COLUMN not in data:
+        return data
+    dates = data[DATE_COLUMN].to_numpy()
+    lo = dates.searchsorted(_as_datetime64(start), "left") if start is not None else 0
+    hi = dates.searchsorted(_as_datetime64(end), "right") if end is not None else len(dates)
+    return data.iloc[lo:hi]
+
+
+def format_date(value):
+    # Untuk teks tampilan; string lama dikembalikan apa adanya
+    return value.strftime("%Y-%m-%d") if isinstance(value, pd.Timestamp) else str(value)
+
+
+def _as_datetime64(day):
+    return np.datetime64(pd.Timestamp(day).normalize().to_datetime64(), "s")
@@ -0,0 +1,177 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from metrics import Metrics
+from taskindex import PENDING
+
+# Key baris hasil merge() yang belum punya key storage
+JOURNAL_PREFIX = "jurnal:"
+
+
+# --- ANTREAN UNGGAH DI LATAR BELAKANG ---
+# submit() hanya menulis baris + foto mentah ke spool di disk lalu langsung
+# kembali. Thread pekerja membaca spool, meng-encode foto di thread pool,
+# mengirim baris per sheet dalam batch lewat storage.append, dan mencoba
+# lagi dengan jeda bertambah selama backend gagal. Isi spool bertahan saat
+# aplikasi restart dan dikirim ulang ketika antrean dibuat kembali.
+# Spool juga berfungsi sebagai jurnal tulis-dulu: semua submit tercatat di
+# disk server sebelum dikonfirmasi, dan merge() menggabungkannya dengan data
+# remote sehingga checklist tetap benar saat backend tidak terjangkau.
+# Batch yang sudah tersimpan diterbitkan ke feed (ChangeFeed) bila ada.
+class UploadQueue:
+    def __init__(self, storage, spool_dir, prepare_photo, workers=2, batch_size=20,
+                 retry_delay=5.0, max_delay=300.0, feed=None, metrics=None):
+        # prepare_photo(kolom, bytes_mentah, baris) -> dict kolom baris (ref foto + thumbnail)
+        self.storage = storage
+        self.feed = feed
+        # Tulis batch ke storage diukur sebagai "flush" (jalur tulis aplikasi)
+        self.metrics = metrics or Metrics()
+        self.spool_dir = spool_dir
+        self.prepare_photo = prepare_photo
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self.max_delay = max_delay
+        self.last_error = None
+        os.makedirs(os.path.join(spool_dir, "failed"), exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload-photo")
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._wake.set()
+        self._thread = threading.Thread(target=self._run, name="upload-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, sheet_name, row, photos=None):
+        # Baris dengan "id" yang masih menunggu di spool tidak diantrekan dua kali
+        if row.get("id"):
+            for name in os.listdir(self.spool_dir):
+                if name.endswith(f"-{row['id']}.json"):
+                    return name[:-len(".json")]
+        entry_id = f"{time.time_ns():020d}-{row.get('id') or uuid.uuid4().hex}"
+        photos = {col: data for col, data in (photos or {}).items() if data}
+        # Foto ditulis dulu; entri baru terlihat pekerja setelah .json ada
+        for col, data in photos.items():
+            _write_atomic(self._path(entry_id, col), data)
+        entry = {"id": entry_id, "sheet": sheet_name, "row": row, "photos": list(photos)}
+        _write_atomic(self._path(entry_id, "json"), json.dumps(entry).encode())
+        self._wake.set()
+        return entry_id
+
+    def pending(self, sheet_name):
+        # Baris yang belum sampai ke storage (tanpa kolom foto)
+        return pd.DataFrame([e["row"] for e in self._entries() if e["sheet"] == sheet_name])
+
+    def merge(self, sheet_name, data, start=None, end=None):
+        # data remote (dibaca dengan kolom "id") + baris jurnal yang belum ada
+        # di remote, bertanda status PENDING; frame asli dikembalikan apa
+        # adanya jika jurnal kosong supaya cache index per frame tetap terpakai
+        known = set(data["id"]) if "id" in data else set()
+        entries = [e for e in self._entries() if e["sheet"] == sheet_name
+                   and e["row"].get("id") not in known
+                   and (start is None or str(e["row"].get("tanggal", "")) >= start)
+                   and (end is None or str(e["row"].get("tanggal", "")) <= end)]
+        if not entries:
+            return data
+        journal = pd.DataFrame([e["row"] for e in entries], index=[JOURNAL_PREFIX + e["id"] for e in entries])
+        journal = journal.reindex(columns=data.columns)
+        if "status" in journal:
+            journal["status"] = PENDING
+        return pd.concat([data, journal]) if not data.empty else journal
+
+    def sync(self):
+        # Backend terjangkau lagi: kirim jurnal sekarang, jangan tunggu jeda backoff
+        if self.last_error is not None:
+            self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            entries = self._entries()
+            for sheet_name in dict.fromkeys(e["sheet"] for e in entries):
+                same_sheet = [e for e in entries if e["sheet"] == sheet_name]
+                for i in range(0, len(same_sheet), self.batch_size):
+                    batch = same_sheet[i:i + self.batch_size]
+                    rows = list(self._pool.map(self._prepare, batch))
+                    ready = [(e, r) for e, r in zip(batch, rows) if r is not None]
+                    if ready:
+                        rows = pd.DataFrame([r for _, r in ready])
+                        with self.metrics.timer("flush", sheet=sheet_name) as t:
+                            self.storage.append(sheet_name, t.measure(rows))
+                        if self.feed is not None:
+                            self.feed.publish(sheet_name, rows)
+                    for e, _ in ready:
+                        self._remove(e)
+
+    def _run(self):
+        delay = None
+        while True:
+            self._wake.wait(timeout=delay)
+            self._wake.clear()
+            try:
+                self.flush()
+                self.last_error = None
+                delay = None
+            except Exception as e:
+                self.last_error = e
+                delay = min(delay * 2, self.max_delay) if delay else self.retry_delay
+
+    def _prepare(self, entry):
+        row = dict(entry["row"])
+        try:
+            for col in entry["photos"]:
+                with open(self._path(entry["id"], col), "rb") as f:
+                    row.update(self.prepare_photo(col, f.read(), entry["row"]))
+        except (OSError, ValueError):
+            # Foto rusak tidak akan pernah berhasil; pindahkan agar antrean jalan terus
+            self._remove(entry, os.path.join(self.spool_dir, "failed"))
+            return None
+        return row
+
+    def _entries(self):
+        entries = []
+        for name in sorted(n for n in os.listdir(self.spool_dir) if n.endswith(".json")):
+            try:
+                with open(os.path.join(self.spool_dir, name)) as f:
+                    entries.append(json.load(f))
+            except (FileNotFoundError, ValueError):
+                continue
+        return entries
+
+    def _remove(self, entry, move_to=None):
+        # .json dihapus pertama supaya entri tidak terkirim dua kali
+        for col in ["json"] + entry["photos"]:
+            path = self._path(entry["id"], col)
+            if not os.path.exists(path):
+                continue
+            if move_to:
+                shutil.move(path, os.path.join(move_to, os.path.basename(path)))
+            else:
+                os.remove(path)
+
+    def _path(self, entry_id, suffix):
+        return os.path.join(self.spool_dir, f"{entry_id}.{suffix}")
+
+
+def is_journal_key(key):
+    return isinstance(key, str) and key.startswith(JOURNAL_PREFIX)
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    # fsync direktori agar rename ikut bertahan saat server mati mendadak
+    dir_fd = os.open(os.path.dirname(path), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)